@@ -0,0 +1,47 @@
+"""
+Utilidades compartidas por los ejemplos para generar datos simulados.
+"""
+import math
+import numpy as np
+
+try:
+    from numba import njit
+except ImportError:
+    njit = None
+
+def simulate_soil_moisture(noise, base_level=40.0, watering_boost=35.0, threshold=50.0):
+    """
+    Simula la humedad del suelo hora a hora con riegos automáticos.
+    
+    Cada riego depende del valor anterior, por lo que el bucle es secuencial;
+    si Numba está disponible se compila a código máquina.
+    
+    Args:
+        noise: Array con el ruido a aplicar en cada hora
+        base_level: Nivel base de humedad
+        watering_boost: Incremento de humedad al regar
+        threshold: Nivel por debajo del cual se riega
+        
+    Returns:
+        Array con los valores de humedad del suelo (0-100%)
+    """
+    n = noise.shape[0]
+    soil_values = np.empty(n)
+    last_watering = -12.0  # Último riego antes del inicio (en horas)
+    
+    for i in range(n):
+        # Patrón de secado (exponencial decreciente, secado en ~2 días)
+        drying_factor = math.exp(-(i - last_watering) / 48.0)
+        moisture = base_level + watering_boost * drying_factor + noise[i]
+        
+        # Regar cuando la humedad baja de cierto umbral
+        if moisture < threshold:
+            last_watering = float(i)
+            moisture = base_level + watering_boost
+        
+        soil_values[i] = max(0.0, min(100.0, moisture))  # Limitar entre 0-100%
+    
+    return soil_values
+
+if njit is not None:
+    simulate_soil_moisture = njit(cache=True)(simulate_soil_moisture)
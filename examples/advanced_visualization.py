@@ -6,99 +6,194 @@ Este script muestra cómo crear visualizaciones personalizadas
 y paneles de control interactivos con los datos de plantas.
 """
 import os
+import gzip
+import zlib
 import sys
 import json
+import pickle
+import hashlib
 import argparse
+import matplotlib
+matplotlib.use('Agg')  # Backend sin interfaz gráfica: solo se generan archivos
 import matplotlib.pyplot as plt
 import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
+from concurrent.futures import ProcessPoolExecutor
 
-# Añadir el directorio actual al path para importar los módulos
-sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Añadir el directorio raíz del repositorio al path (una sola vez) para importar los módulos
+_REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if _REPO_ROOT not in sys.path:
+    sys.path.insert(0, _REPO_ROOT)
 
 from mycodo_plant_analyzer.data_connector import MycodoConnector
 from mycodo_plant_analyzer.data_analyzer import DataPreprocessor, GrowthAnalyzer
+from _sample_data import simulate_soil_moisture
 
-def create_custom_dashboard(sensor_data, analysis_results, output_file):
+# Parámetros de matplotlib orientados a rendimiento para el renderizado a archivo
+plt.rcParams.update({
+    'path.simplify': True,
+    'path.simplify_threshold': 1.0,
+    'agg.path.chunksize': 10000,
+    'figure.max_open_warning': 0
+})
+
+# Formatos de fecha del encabezado y de las etiquetas de los gráficos diarios
+ANALYSIS_DATE_FORMAT = '%d/%m/%Y %H:%M'
+CHART_DATE_FORMAT = '%d/%m'
+
+# Texto mostrado para cada estado de rango óptimo
+STATUS_LABELS = {
+    'optimal': 'ÓPTIMO',
+    'acceptable': 'ACEPTABLE',
+    'suboptimal': 'SUBÓPTIMO'
+}
+
+# Colores de las barras del gráfico comparativo según categoría
+CATEGORY_COLORS = {
+    'excellent': '#28a745',  # Verde
+    'good': '#5cb85c',  # Verde claro
+    'fair': '#f0ad4e',  # Naranja
+    'poor': '#d9534f'  # Rojo
+}
+
+# Subdirectorio (dentro del directorio de salida) para la caché de análisis por perfil
+CACHE_DIR = '.cache'
+
+# Cabecera HTML (estilos y encabezado) del dashboard personalizado
+_DASHBOARD_HEAD = """<!DOCTYPE html>
+<html lang='es'>
+<head>
+  <meta charset='UTF-8'>
+  <meta name='viewport' content='width=device-width, initial-scale=1.0'>
+  <title>Dashboard Visual - {title}</title>
+  <link href='https://cdn.jsdelivr.net/npm/bootstrap@5.1.3/dist/css/bootstrap.min.css' rel='stylesheet'>
+  <script src='https://cdn.jsdelivr.net/npm/chart.js'></script>
+  <style>
+    body {{ font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif; background-color: #f8f9fa; }}
+    .dashboard-card {{ background-color: white; border-radius: 10px; box-shadow: 0 4px 6px rgba(0,0,0,0.1); padding: 20px; margin-bottom: 20px; }}
+    .score-display {{ font-size: 48px; font-weight: bold; text-align: center; }}
+    .excellent {{ color: #28a745; }}
+    .good {{ color: #5cb85c; }}
+    .fair {{ color: #f0ad4e; }}
+    .poor {{ color: #d9534f; }}
+    .parameter-card {{ height: 100%; }}
+    .parameter-value {{ font-size: 24px; font-weight: bold; }}
+    .optimal {{ color: #28a745; }}
+    .acceptable {{ color: #5cb85c; }}
+    .suboptimal {{ color: #d9534f; }}
+    .recommendation-item {{ margin-bottom: 10px; padding: 10px; background-color: #f8f9fa; border-radius: 5px; }}
+  </style>
+</head>
+<body>
+  <div class='container py-4'>
+    <header class='pb-3 mb-4 border-bottom'>
+      <div class='d-flex align-items-center text-dark text-decoration-none'>
+        <span class='fs-4'>Dashboard Visual de Análisis de Plantas</span>
+      </div>
+    </header>
+"""
+
+# Script genérico que crea un gráfico de línea por cada serie del bloque 'charts-data'
+_CHARTS_SCRIPT = """    <script>
+      // Gráficos de línea para cada parámetro
+      JSON.parse(document.getElementById('charts-data').textContent).forEach(function (c) {
+        new Chart(document.getElementById(c.id).getContext('2d'), {
+          type: 'line',
+          data: {
+            labels: c.labels,
+            datasets: [{
+              label: c.label,
+              data: c.data,
+              borderColor: 'rgb(75, 192, 192)',
+              tension: 0.1
+            }]
+          },
+          options: {
+            responsive: true,
+            plugins: {
+              legend: {
+                display: false
+              }
+            },
+            scales: {
+              y: {
+                beginAtZero: false
+              }
+            }
+          }
+        });
+      });
+    </script>
+"""
+
+# Pie de página del dashboard personalizado
+_DASHBOARD_FOOTER = """    <footer class='pt-3 mt-4 text-muted border-top'>
+      <p class='text-center'>Generado por Mycodo Plant Analyzer</p>
+    </footer>
+  </div>
+</body>
+</html>
+"""
+
+def _to_json(obj):
+    """Serializa un objeto (listas o arrays de NumPy) a JSON, con orjson si está disponible."""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_SERIALIZE_NUMPY).decode()
+    return json.dumps(obj, default=lambda o: o.tolist())
+
+def _write_summary(out, analysis_results):
     """
-    Crea un dashboard personalizado con visualizaciones avanzadas.
+    Escribe la evaluación general y el contenedor del gráfico de radar.
     
     Args:
-        sensor_data: Diccionario con DataFrames de diferentes sensores
+        out: Archivo (o similar) donde escribir el HTML
         analysis_results: Resultados del análisis
-        output_file: Ruta al archivo de salida HTML
-        
-    Returns:
-        Ruta al archivo HTML generado
     """
-    # Crear HTML básico
-    html = []
-    html.append("<!DOCTYPE html>")
-    html.append("<html lang='es'>")
-    html.append("<head>")
-    html.append("  <meta charset='UTF-8'>")
-    html.append("  <meta name='viewport' content='width=device-width, initial-scale=1.0'>")
-    html.append(f"  <title>Dashboard Visual - {analysis_results.get('plant_profile', 'Desconocido')}</title>")
-    html.append("  <link href='https://cdn.jsdelivr.net/npm/bootstrap@5.1.3/dist/css/bootstrap.min.css' rel='stylesheet'>")
-    html.append("  <script src='https://cdn.jsdelivr.net/npm/chart.js'></script>")
-    html.append("  <style>")
-    html.append("    body { font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif; background-color: #f8f9fa; }")
-    html.append("    .dashboard-card { background-color: white; border-radius: 10px; box-shadow: 0 4px 6px rgba(0,0,0,0.1); padding: 20px; margin-bottom: 20px; }")
-    html.append("    .score-display { font-size: 48px; font-weight: bold; text-align: center; }")
-    html.append("    .excellent { color: #28a745; }")
-    html.append("    .good { color: #5cb85c; }")
-    html.append("    .fair { color: #f0ad4e; }")
-    html.append("    .poor { color: #d9534f; }")
-    html.append("    .parameter-card { height: 100%; }")
-    html.append("    .parameter-value { font-size: 24px; font-weight: bold; }")
-    html.append("    .optimal { color: #28a745; }")
-    html.append("    .acceptable { color: #5cb85c; }")
-    html.append("    .suboptimal { color: #d9534f; }")
-    html.append("    .recommendation-item { margin-bottom: 10px; padding: 10px; background-color: #f8f9fa; border-radius: 5px; }")
-    html.append("  </style>")
-    html.append("</head>")
-    html.append("<body>")
-    html.append("  <div class='container py-4'>")
-    
-    # Encabezado
-    html.append("    <header class='pb-3 mb-4 border-bottom'>")
-    html.append("      <div class='d-flex align-items-center text-dark text-decoration-none'>")
-    html.append("        <span class='fs-4'>Dashboard Visual de Análisis de Plantas</span>")
-    html.append("      </div>")
-    html.append("    </header>")
-    
-    # Información general
-    html.append("    <div class='row align-items-md-stretch'>")
-    html.append("      <div class='col-md-6'>")
-    html.append("        <div class='h-100 p-5 dashboard-card'>")
-    html.append(f"          <h2>Perfil: {analysis_results.get('plant_profile', 'Desconocido').capitalize()}</h2>")
-    html.append(f"          <p>Fecha de análisis: {datetime.fromisoformat(analysis_results.get('timestamp', datetime.now().isoformat())).strftime('%d/%m/%Y %H:%M')}</p>")
-    
-    # Evaluación general
     overall_analysis = analysis_results.get('overall_analysis', {})
     overall_score = overall_analysis.get('overall_score', 0)
     category = overall_analysis.get('category', 'fair')
     
-    html.append(f"          <div class='score-display {category}'>{overall_score:.1f}</div>")
-    html.append(f"          <p class='text-center'><strong>Categoría:</strong> {category.upper()}</p>")
-    html.append(f"          <p class='text-center'>{overall_analysis.get('message', '')}</p>")
-    html.append("        </div>")
-    html.append("      </div>")
-    
-    # Gráfico de radar
-    html.append("      <div class='col-md-6'>")
-    html.append("        <div class='h-100 p-5 dashboard-card'>")
-    html.append("          <h2>Análisis de Parámetros</h2>")
-    html.append("          <canvas id='radarChart'></canvas>")
-    html.append("        </div>")
-    html.append("      </div>")
-    html.append("    </div>")
+    # Fecha del análisis (datetime o cadena ISO; solo se parsea la cadena)
+    analysis_date = analysis_results.get('timestamp')
+    if not isinstance(analysis_date, datetime):
+        analysis_date = datetime.fromisoformat(analysis_date) if analysis_date else datetime.now()
+    
+    # Información general y gráfico de radar
+    out.write(f"""    <div class='row align-items-md-stretch'>
+      <div class='col-md-6'>
+        <div class='h-100 p-5 dashboard-card'>
+          <h2>Perfil: {analysis_results.get('plant_profile', 'Desconocido').capitalize()}</h2>
+          <p>Fecha de análisis: {analysis_date.strftime(ANALYSIS_DATE_FORMAT)}</p>
+          <div class='score-display {category}'>{overall_score:.1f}</div>
+          <p class='text-center'><strong>Categoría:</strong> {category.upper()}</p>
+          <p class='text-center'>{overall_analysis.get('message', '')}</p>
+        </div>
+      </div>
+      <div class='col-md-6'>
+        <div class='h-100 p-5 dashboard-card'>
+          <h2>Análisis de Parámetros</h2>
+          <canvas id='radarChart'></canvas>
+        </div>
+      </div>
+    </div>
+""")
+
+def _write_parameter_cards(out, param_analysis):
+    """
+    Escribe una tarjeta por cada parámetro analizado.
     
-    # Parámetros individuales
-    html.append("    <div class='row mt-4'>")
+    Args:
+        out: Archivo (o similar) donde escribir el HTML
+        param_analysis: Diccionario con análisis de parámetros
+    """
+    out.write("    <div class='row mt-4'>\n")
     
-    param_analysis = analysis_results.get('parameter_analysis', {})
     for param, analysis in param_analysis.items():
         # Determinar estado
         status = 'unknown'
@@ -120,174 +215,171 @@ def create_custom_dashboard(sensor_data, analysis_results, output_file):
         if 'range_analysis' in analysis and 'pct_in_range' in analysis['range_analysis']:
             pct_in_range = analysis['range_analysis']['pct_in_range']
         
-        html.append("      <div class='col-md-3 mb-4'>")
-        html.append("        <div class='dashboard-card parameter-card'>")
-        html.append(f"          <h4>{param.capitalize()}</h4>")
-        html.append(f"          <div class='parameter-value {status}'>{mean_value:.2f}</div>")
-        
-        # Estado
+        # Estado y tendencia (solo si están disponibles)
+        status_html = ''
         if 'range_analysis' in analysis and 'status' in analysis['range_analysis']:
-            status_map = {
-                'optimal': 'ÓPTIMO',
-                'acceptable': 'ACEPTABLE',
-                'suboptimal': 'SUBÓPTIMO'
-            }
-            status_text = status_map.get(status, status.upper())
-            html.append(f"          <p><strong>Estado:</strong> <span class='{status}'>{status_text}</span></p>")
-            html.append(f"          <p><strong>En rango:</strong> {pct_in_range:.1f}%</p>")
+            status_text = STATUS_LABELS.get(status, status.upper())
+            status_html = (f"          <p><strong>Estado:</strong> <span class='{status}'>{status_text}</span></p>\n"
+                           f"          <p><strong>En rango:</strong> {pct_in_range:.1f}%</p>\n")
         
-        # Tendencia
+        trend_html = ''
         if 'trend_analysis' in analysis and 'message' in analysis['trend_analysis']:
-            html.append(f"          <p><strong>Tendencia:</strong> {analysis['trend_analysis']['message']}</p>")
-        
-        # Gráfico de línea para este parámetro
-        html.append(f"          <canvas id='chart_{param}'></canvas>")
-        html.append("        </div>")
-        html.append("      </div>")
-    
-    html.append("    </div>")
-    
-    # Recomendaciones
-    recommendations = overall_analysis.get('recommendations', [])
-    if recommendations:
-        html.append("    <div class='row mt-4'>")
-        html.append("      <div class='col-12'>")
-        html.append("        <div class='dashboard-card'>")
-        html.append("          <h2>Recomendaciones</h2>")
-        html.append("          <div class='row'>")
-        
-        for i, rec in enumerate(recommendations):
-            html.append("            <div class='col-md-6'>")
-            html.append(f"              <div class='recommendation-item'>{i+1}. {rec}</div>")
-            html.append("            </div>")
-        
-        html.append("          </div>")
-        html.append("        </div>")
-        html.append("      </div>")
-        html.append("    </div>")
-    
-    # Scripts para gráficos
-    html.append("    <script>")
-    
-    # Datos para gráfico de radar
-    html.append("      // Gráfico de radar para parámetros")
-    html.append("      const radarCtx = document.getElementById('radarChart').getContext('2d');")
-    html.append("      const radarData = {")
-    html.append("        labels: [")
-    
-    # Etiquetas de parámetros
-    param_labels = []
-    for param in param_analysis.keys():
-        param_labels.append(f"'{param.capitalize()}'")
-    html.append("          " + ", ".join(param_labels))
-    
-    html.append("        ],")
-    html.append("        datasets: [{")
-    html.append("          label: 'Porcentaje en Rango Óptimo',")
-    html.append("          data: [")
-    
-    # Valores de parámetros
-    param_values = []
-    for param, analysis in param_analysis.items():
-        if 'range_analysis' in analysis and 'pct_in_range' in analysis['range_analysis']:
-            param_values.append(str(analysis['range_analysis']['pct_in_range']))
-        else:
-            param_values.append("0")
-    html.append("            " + ", ".join(param_values))
-    
-    html.append("          ],")
-    html.append("          backgroundColor: 'rgba(54, 162, 235, 0.2)',")
-    html.append("          borderColor: 'rgb(54, 162, 235)',")
-    html.append("          pointBackgroundColor: 'rgb(54, 162, 235)',")
-    html.append("          pointBorderColor: '#fff',")
-    html.append("          pointHoverBackgroundColor: '#fff',")
-    html.append("          pointHoverBorderColor: 'rgb(54, 162, 235)'")
-    html.append("        }]")
-    html.append("      };")
-    html.append("      const radarConfig = {")
-    html.append("        type: 'radar',")
-    html.append("        data: radarData,")
-    html.append("        options: {")
-    html.append("          scales: {")
-    html.append("            r: {")
-    html.append("              beginAtZero: true,")
-    html.append("              max: 100,")
-    html.append("              ticks: {")
-    html.append("                stepSize: 20")
-    html.append("              }")
-    html.append("            }")
-    html.append("          }")
-    html.append("        }")
-    html.append("      };")
-    html.append("      new Chart(radarCtx, radarConfig);")
-    
-    # Gráficos de línea para cada parámetro
+            trend_html = f"          <p><strong>Tendencia:</strong> {analysis['trend_analysis']['message']}</p>\n"
+        
+        # Tarjeta completa con el gráfico de línea para este parámetro
+        out.write(f"""      <div class='col-md-3 mb-4'>
+        <div class='dashboard-card parameter-card'>
+          <h4>{param.capitalize()}</h4>
+          <div class='parameter-value {status}'>{mean_value:.2f}</div>
+{status_html}{trend_html}          <canvas id='chart_{param}'></canvas>
+        </div>
+      </div>
+""")
+    
+    out.write("    </div>\n")
+
+def _write_recommendations(out, recommendations):
+    """
+    Escribe la sección de recomendaciones (si hay alguna).
+    
+    Args:
+        out: Archivo (o similar) donde escribir el HTML
+        recommendations: Lista de recomendaciones
+    """
+    if not recommendations:
+        return
+    
+    out.write("""    <div class='row mt-4'>
+      <div class='col-12'>
+        <div class='dashboard-card'>
+          <h2>Recomendaciones</h2>
+          <div class='row'>
+""")
+    
+    for i, rec in enumerate(recommendations):
+        out.write(f"""            <div class='col-md-6'>
+              <div class='recommendation-item'>{i+1}. {rec}</div>
+            </div>
+""")
+    
+    out.write("""          </div>
+        </div>
+      </div>
+    </div>
+""")
+
+def _write_radar_script(out, param_analysis):
+    """
+    Escribe el script del gráfico de radar de porcentaje en rango óptimo.
+    
+    Args:
+        out: Archivo (o similar) donde escribir el HTML
+        param_analysis: Diccionario con análisis de parámetros
+    """
+    param_labels = [param.capitalize() for param in param_analysis.keys()]
+    param_values = [
+        analysis.get('range_analysis', {}).get('pct_in_range', 0)
+        for analysis in param_analysis.values()
+    ]
+    
+    out.write(f"""    <script>
+      // Gráfico de radar para parámetros
+      const radarCtx = document.getElementById('radarChart').getContext('2d');
+      const radarData = {{
+        labels: {_to_json(param_labels)},
+        datasets: [{{
+          label: 'Porcentaje en Rango Óptimo',
+          data: {_to_json(param_values)},
+          backgroundColor: 'rgba(54, 162, 235, 0.2)',
+          borderColor: 'rgb(54, 162, 235)',
+          pointBackgroundColor: 'rgb(54, 162, 235)',
+          pointBorderColor: '#fff',
+          pointHoverBackgroundColor: '#fff',
+          pointHoverBorderColor: 'rgb(54, 162, 235)'
+        }}]
+      }};
+      const radarConfig = {{
+        type: 'radar',
+        data: radarData,
+        options: {{
+          scales: {{
+            r: {{
+              beginAtZero: true,
+              max: 100,
+              ticks: {{
+                stepSize: 20
+              }}
+            }}
+          }}
+        }}
+      }};
+      new Chart(radarCtx, radarConfig);
+    </script>
+""")
+
+def _write_chart_data(out, sensor_data):
+    """
+    Escribe las series diarias de cada parámetro como un bloque JSON, serie a serie,
+    seguido del script genérico que crea los gráficos de línea.
+    
+    Args:
+        out: Archivo (o similar) donde escribir el HTML
+        sensor_data: Diccionario con DataFrames de diferentes sensores
+    """
+    out.write("    <script id='charts-data' type='application/json'>[")
+    
+    separator = ''
     for param, df in sensor_data.items():
         if df.empty:
             continue
             
-        # Preparar datos para el gráfico
-        dates = []
-        values = []
-        
         # Remuestrear a datos diarios para simplificar
+        chart = {'id': f"chart_{param}", 'label': param.capitalize(), 'labels': [], 'data': []}
         if 'timestamp' in df.columns:
-            df['date'] = df['timestamp'].dt.date
-            daily_avg = df.groupby('date')['value'].mean().reset_index()
-            
-            for _, row in daily_avg.iterrows():
-                dates.append(row['date'].strftime('%d/%m'))
-                values.append(str(row['value']))
+            daily_avg = df.set_index('timestamp')['value'].resample('D').mean().dropna()
+            chart['labels'] = daily_avg.index.strftime(CHART_DATE_FORMAT).tolist()
+            chart['data'] = daily_avg.to_numpy()
+        
+        out.write(separator)
+        out.write(_to_json(chart).replace('</', '<\\/'))
+        separator = ','
+    
+    out.write("]</script>\n")
+    out.write(_CHARTS_SCRIPT)
+
+def create_custom_dashboard(sensor_data, analysis_results, output_file):
+    """
+    Crea un dashboard personalizado con visualizaciones avanzadas.
+    
+    El HTML se escribe sección a sección directamente en el archivo de salida,
+    sin construir el documento completo en memoria.
+    
+    Args:
+        sensor_data: Diccionario con DataFrames de diferentes sensores
+        analysis_results: Resultados del análisis
+        output_file: Ruta al archivo de salida HTML. Si termina en '.gz' el HTML
+            se guarda comprimido con gzip (los servidores web estáticos pueden
+            servirlo directamente con 'Content-Encoding: gzip')
         
-        # Crear gráfico de línea
-        html.append(f"      // Gráfico de línea para {param}")
-        html.append(f"      const {param}Ctx = document.getElementById('chart_{param}').getContext('2d');")
-        html.append(f"      const {param}Data = {{")
-        html.append("        labels: [")
-        html.append("          " + ", ".join([f"'{d}'" for d in dates]))
-        html.append("        ],")
-        html.append("        datasets: [{")
-        html.append(f"          label: '{param.capitalize()}',")
-        html.append("          data: [")
-        html.append("            " + ", ".join(values))
-        html.append("          ],")
-        html.append("          borderColor: 'rgb(75, 192, 192)',")
-        html.append("          tension: 0.1")
-        html.append("        }]")
-        html.append("      };")
-        html.append(f"      const {param}Config = {{")
-        html.append("        type: 'line',")
-        html.append(f"        data: {param}Data,")
-        html.append("        options: {")
-        html.append("          responsive: true,")
-        html.append("          plugins: {")
-        html.append("            legend: {")
-        html.append("              display: false")
-        html.append("            }")
-        html.append("          },")
-        html.append("          scales: {")
-        html.append("            y: {")
-        html.append("              beginAtZero: false")
-        html.append("            }")
-        html.append("          }")
-        html.append("        }")
-        html.append("      };")
-        html.append(f"      new Chart({param}Ctx, {param}Config);")
-    
-    html.append("    </script>")
-    
-    # Pie de página
-    html.append("    <footer class='pt-3 mt-4 text-muted border-top'>")
-    html.append("      <p class='text-center'>Generado por Mycodo Plant Analyzer</p>")
-    html.append("    </footer>")
-    
-    html.append("  </div>")
-    html.append("</body>")
-    html.append("</html>")
-    
-    # Guardar archivo HTML
-    with open(output_file, 'w') as f:
-        f.write("\n".join(html))
+    Returns:
+        Ruta al archivo HTML generado
+    """
+    if output_file.endswith('.gz'):
+        out = gzip.open(output_file, 'wt', compresslevel=6, encoding='utf-8')
+    else:
+        out = open(output_file, 'w', encoding='utf-8', buffering=1 << 16)
+    
+    overall_analysis = analysis_results.get('overall_analysis', {})
+    param_analysis = analysis_results.get('parameter_analysis', {})
+    
+    with out:
+        out.write(_DASHBOARD_HEAD.format(title=analysis_results.get('plant_profile', 'Desconocido')))
+        _write_summary(out, analysis_results)
+        _write_parameter_cards(out, param_analysis)
+        _write_recommendations(out, overall_analysis.get('recommendations', []))
+        _write_radar_script(out, param_analysis)
+        _write_chart_data(out, sensor_data)
+        out.write(_DASHBOARD_FOOTER)
     
     return output_file
 
@@ -323,51 +415,148 @@ def create_comparison_chart(profiles, analysis_results, output_file):
             categories.append('unknown')
     
     # Crear figura
-    plt.figure(figsize=(12, 6))
-    
-    # Colores según categoría
-    colors = []
-    for category in categories:
-        if category == 'excellent':
-            colors.append('#28a745')  # Verde
-        elif category == 'good':
-            colors.append('#5cb85c')  # Verde claro
-        elif category == 'fair':
-            colors.append('#f0ad4e')  # Naranja
-        elif category == 'poor':
-            colors.append('#d9534f')  # Rojo
-        else:
-            colors.append('#6c757d')  # Gris
+    fig, ax = plt.subplots(figsize=(12, 6))
+    
+    # Colores según categoría (gris si es desconocida)
+    colors = [CATEGORY_COLORS.get(category, '#6c757d') for category in categories]
     
     # Crear gráfico de barras
-    bars = plt.bar(profiles, scores, color=colors)
+    bars = ax.bar(profiles, scores, color=colors)
     
     # Añadir etiquetas de valor
-    for bar in bars:
-        height = bar.get_height()
-        plt.text(bar.get_x() + bar.get_width()/2., height + 1,
-                f'{height:.1f}', ha='center', va='bottom')
+    ax.bar_label(bars, fmt='%.1f', padding=3)
     
     # Configurar etiquetas y título
-    plt.xlabel('Perfiles de Plantas')
-    plt.ylabel('Puntuación de Crecimiento')
-    plt.title('Comparación de Perfiles de Plantas')
+    ax.set_xlabel('Perfiles de Plantas')
+    ax.set_ylabel('Puntuación de Crecimiento')
+    ax.set_title('Comparación de Perfiles de Plantas')
     
     # Añadir líneas de referencia
-    plt.axhline(y=80, color='#28a745', linestyle='--', alpha=0.5, label='Excelente')
-    plt.axhline(y=60, color='#5cb85c', linestyle='--', alpha=0.5, label='Bueno')
-    plt.axhline(y=40, color='#f0ad4e', linestyle='--', alpha=0.5, label='Aceptable')
+    ax.axhline(y=80, color='#28a745', linestyle='--', alpha=0.5, label='Excelente')
+    ax.axhline(y=60, color='#5cb85c', linestyle='--', alpha=0.5, label='Bueno')
+    ax.axhline(y=40, color='#f0ad4e', linestyle='--', alpha=0.5, label='Aceptable')
     
     # Añadir leyenda
-    plt.legend()
+    ax.legend()
     
     # Guardar imagen
-    plt.tight_layout()
-    plt.savefig(output_file, dpi=100)
-    plt.close()
+    fig.tight_layout()
+    fig.savefig(output_file, dpi=100)
+    plt.close(fig)
     
     return output_file
 
+def _analyze_sample_profile(task):
+    """
+    Genera datos simulados y analiza un perfil de planta (ejecutado en un proceso aparte).
+    
+    Args:
+        task: Tupla (perfil, días, configuración)
+        
+    Returns:
+        Tupla (perfil, resultados del análisis)
+    """
+    profile, days, config = task
+    preprocessor = DataPreprocessor(config=config)
+    analyzer = GrowthAnalyzer(config=config)
+    
+    profile_data = generate_sample_data(profile, days)
+    for param, df in profile_data.items():
+        profile_data[param] = preprocessor.clean_data(df)
+    
+    return profile, analyzer.analyze_growth_conditions(profile_data, profile)
+
+def _get_cache_file(cache_dir, profile, days, config):
+    """
+    Obtiene la ruta del archivo de caché con el análisis de un perfil.
+    
+    La clave incluye el perfil, los días, la fecha actual y la configuración,
+    de modo que la caché se invalida al cambiar cualquiera de ellos.
+    
+    Args:
+        cache_dir: Directorio de caché
+        profile: Nombre del perfil de planta
+        days: Número de días de datos históricos
+        config: Diccionario de configuración
+        
+    Returns:
+        Ruta al archivo de caché
+    """
+    key_source = f"{profile}|{days}|{datetime.now():%Y-%m-%d}|{json.dumps(config, sort_keys=True)}"
+    key = hashlib.blake2b(key_source.encode('utf-8'), digest_size=16).hexdigest()
+    return os.path.join(cache_dir, f"{key}.pkl")
+
+def start_profile_comparison(executor, profiles, main_profile, days, config, output_dir):
+    """
+    Carga de la caché el análisis del resto de perfiles y envía al pool de
+    procesos los que faltan, sin esperar a que terminen.
+    
+    Debe llamarse desde el hilo principal: los procesos del pool se crean al
+    enviar los trabajos y no deben hacerse fork con otros hilos en ejecución.
+    
+    Args:
+        executor: ProcessPoolExecutor donde analizar los perfiles
+        profiles: Lista de perfiles de plantas
+        main_profile: Perfil ya analizado
+        days: Número de días de datos históricos
+        config: Diccionario de configuración
+        output_dir: Directorio de salida
+        
+    Returns:
+        Tupla (resultados en caché por perfil, {perfil: (archivo de caché, Future)})
+    """
+    # Simular análisis para otros perfiles (reutilizando la caché si existe)
+    cache_dir = os.path.join(output_dir, CACHE_DIR)
+    os.makedirs(cache_dir, exist_ok=True)
+    
+    cached_results = {}
+    pending = {}
+    for profile in profiles:
+        if profile != main_profile:
+            cache_file = _get_cache_file(cache_dir, profile, days, config)
+            if os.path.exists(cache_file):
+                print(f"Usando análisis en caché para perfil: {profile}")
+                with open(cache_file, 'rb') as f:
+                    cached_results[profile] = pickle.load(f)
+            else:
+                # Los perfiles son independientes, así que se analizan en paralelo
+                print(f"Analizando perfil adicional: {profile}")
+                pending[profile] = (cache_file, executor.submit(_analyze_sample_profile, (profile, days, config)))
+    
+    return cached_results, pending
+
+def compare_profiles(profiles, main_profile, main_results, cached_results, pending, output_dir):
+    """
+    Recoge el análisis del resto de perfiles y crea el gráfico comparativo.
+    
+    Args:
+        profiles: Lista de perfiles de plantas
+        main_profile: Perfil ya analizado
+        main_results: Resultados del análisis del perfil ya analizado
+        cached_results: Resultados en caché por perfil (ver start_profile_comparison)
+        pending: Análisis en curso {perfil: (archivo de caché, Future)}
+        output_dir: Directorio de salida
+        
+    Returns:
+        Ruta al archivo de imagen generado (None si no hay perfiles que comparar)
+    """
+    all_results = {main_profile: main_results}
+    all_results.update(cached_results)
+    for cache_file, future in pending.values():
+        profile, profile_results = future.result()
+        if profile_results['status'] == 'success':
+            all_results[profile] = profile_results
+            with open(cache_file, 'wb') as f:
+                pickle.dump(profile_results, f)
+    
+    if len(all_results) < 2:
+        print("Comparación omitida: se necesitan al menos 2 perfiles analizados")
+        return None
+    
+    # Crear gráfico comparativo
+    comparison_file = os.path.join(output_dir, "profile_comparison.png")
+    return create_comparison_chart(profiles, all_results, comparison_file)
+
 def main():
     """Función principal para demostrar visualizaciones avanzadas."""
     parser = argparse.ArgumentParser(description='Visualizaciones avanzadas para Mycodo Plant Analyzer')
@@ -379,6 +568,10 @@ def main():
                         help='Número de días de datos históricos')
     parser.add_argument('--output', type=str, default=None,
                         help='Directorio de salida para visualizaciones')
+    parser.add_argument('--gzip', action='store_true',
+                        help='Guardar el dashboard comprimido como .html.gz')
+    parser.add_argument('--no-compare', dest='compare', action='store_false',
+                        help='No generar la comparación con el resto de perfiles')
     
     args = parser.parse_args()
     
@@ -387,9 +580,10 @@ def main():
         print(f"Error: Archivo de configuración '{args.config}' no encontrado")
         sys.exit(1)
     
-    # Cargar configuración
-    with open(args.config, 'r') as f:
-        config = json.load(f)
+    # Cargar configuración (una sola vez; los procesos de comparación reciben el diccionario)
+    with open(args.config, 'rb') as f:
+        config_bytes = f.read()
+    config = orjson.loads(config_bytes) if orjson is not None else json.loads(config_bytes)
     
     # Establecer directorio de salida
     if args.output:
@@ -434,39 +628,38 @@ def main():
             print(f"Error en el análisis: {analysis_results.get('message', 'Error desconocido')}")
             sys.exit(1)
         
-        # Generar dashboard personalizado
-        print("Generando dashboard visual personalizado...")
-        dashboard_file = os.path.join(output_dir, f"visual_dashboard_{args.profile}.html")
-        dashboard_path = create_custom_dashboard(sensor_data, analysis_results, dashboard_file)
+        # El analizador ya no se usa: se detiene su pool de renderizado (si lo
+        # hay) antes de crear los procesos de la comparación
+        analyzer.close()
         
-        print(f"Dashboard visual generado: {dashboard_path}")
-        print(f"Abra este archivo en su navegador para ver las visualizaciones avanzadas.")
-        
-        # Generar comparación si hay múltiples perfiles
+        # La comparación entre perfiles es independiente del dashboard: sus
+        # análisis se envían a otros procesos desde el hilo principal y se
+        # recogen después de escribir el HTML
         profiles = list(config.get('plant_profiles', {}).keys())
-        if len(profiles) > 1:
-            print("\nGenerando comparación entre perfiles...")
+        with ProcessPoolExecutor() as executor:
+            comparison = None
+            if args.compare and len(profiles) > 1:
+                print("\nGenerando comparación entre perfiles...")
+                comparison = start_profile_comparison(
+                    executor, profiles, args.profile, args.days, config, output_dir
+                )
             
-            # Simular análisis para otros perfiles
-            all_results = {args.profile: analysis_results}
-            for profile in profiles:
-                if profile != args.profile:
-                    # Generar datos simulados y análisis para comparación
-                    print(f"Analizando perfil adicional: {profile}")
-                    profile_data = generate_sample_data(profile, args.days)
-                    for param, df in profile_data.items():
-                        profile_data[param] = preprocessor.clean_data(df)
-                    
-                    profile_results = analyzer.analyze_growth_conditions(profile_data, profile)
-                    if profile_results['status'] == 'success':
-                        all_results[profile] = profile_results
+            # Generar dashboard personalizado
+            print("Generando dashboard visual personalizado...")
+            dashboard_file = os.path.join(output_dir, f"visual_dashboard_{args.profile}.html")
+            if args.gzip:
+                dashboard_file += '.gz'
+            dashboard_path = create_custom_dashboard(sensor_data, analysis_results, dashboard_file)
             
-            # Crear gráfico comparativo
-            comparison_file = os.path.join(output_dir, "profile_comparison.png")
-            comparison_path = create_comparison_chart(profiles, all_results, comparison_file)
+            print(f"Dashboard visual generado: {dashboard_path}")
+            print(f"Abra este archivo en su navegador para ver las visualizaciones avanzadas.")
             
-            if comparison_path:
-                print(f"Gráfico comparativo generado: {comparison_path}")
+            if comparison is not None:
+                comparison_path = compare_profiles(
+                    profiles, args.profile, analysis_results, *comparison, output_dir
+                )
+                if comparison_path:
+                    print(f"Gráfico comparativo generado: {comparison_path}")
         
     except Exception as e:
         print(f"Error durante la generación de visualizaciones: {str(e)}")
@@ -474,26 +667,37 @@ def main():
         traceback.print_exc()
         sys.exit(1)
 
-def generate_sample_data(plant_profile, days=30):
+def generate_sample_data(plant_profile, days=30, seed=None):
     """
     Genera datos de muestra para demostración.
     
     Args:
         plant_profile: Nombre del perfil de planta
         days: Número de días de datos históricos
+        seed: Semilla del generador aleatorio (por defecto se deriva del perfil,
+            de modo que los datos son reproducibles para cada perfil)
         
     Returns:
         Diccionario con DataFrames de diferentes sensores
     """
-    import pandas as pd
-    import numpy as np
-    from datetime import datetime, timedelta
-    
     # Fecha de inicio (hace X días)
     start_date = datetime.now() - timedelta(days=days)
     
-    # Generar timestamps
-    timestamps = [start_date + timedelta(hours=i) for i in range(days * 24)]
+    # Generar timestamps (una muestra por hora)
+    n = days * 24
+    timestamps = pd.date_range(start_date, periods=n, freq='h')
+    idx = np.arange(n)
+    hours = timestamps.hour.to_numpy()
+    
+    # Generar todo el ruido de una vez con un único generador
+    if seed is None:
+        seed = zlib.crc32(plant_profile.encode('utf-8'))
+    rng = np.random.default_rng(seed)
+    temp_noise = rng.normal(0, 0.5, n)
+    humidity_noise = rng.normal(0, 1, n)  # Más variabilidad
+    light_noise = rng.normal(0, 1000, n)
+    night_light_noise = rng.normal(0, 100, n)
+    soil_noise = rng.normal(0, 1, n)
     
     # Generar datos para diferentes parámetros
     sensor_data = {}
@@ -529,20 +733,8 @@ def generate_sample_data(plant_profile, days=30):
         base_moisture = 60
     
     # Temperatura (patrón diario con tendencia)
-    temp_values = []
-    for i, ts in enumerate(timestamps):
-        # Patrón diario (más caliente durante el día, más frío durante la noche)
-        hour = ts.hour
-        daily_pattern = 3 * np.sin(hour * np.pi / 12)
-        
-        # Tendencia
-        trend = i * temp_trend
-        
-        # Valor base + patrón + tendencia + ruido
-        noise = np.random.normal(0, 0.5)
-        value = base_temp + daily_pattern + trend + noise
-        
-        temp_values.append(value)
+    # Valor base + patrón diario (más caliente durante el día) + tendencia + ruido
+    temp_values = base_temp + 3 * np.sin(hours * np.pi / 12) + idx * temp_trend + temp_noise
     
     sensor_data['temperature'] = pd.DataFrame({
         'timestamp': timestamps,
@@ -550,41 +742,20 @@ def generate_sample_data(plant_profile, days=30):
     })
     
     # Humedad (patrón inverso a temperatura)
-    humidity_values = []
-    for i, ts in enumerate(timestamps):
-        hour = ts.hour
-        daily_pattern = -5 * np.sin(hour * np.pi / 12)  # Inverso a temperatura
-        
-        # Tendencia
-        trend = i * humidity_trend
-        
-        # Valor base + patrón + tendencia + ruido
-        noise = np.random.normal(0, 1)  # Más variabilidad
-        value = base_humidity + daily_pattern + trend + noise
-        
-        humidity_values.append(value)
+    humidity_values = base_humidity - 5 * np.sin(hours * np.pi / 12) + idx * humidity_trend + humidity_noise
     
     sensor_data['humidity'] = pd.DataFrame({
         'timestamp': timestamps,
         'value': humidity_values
     })
     
-    # Luz (solo durante el día)
-    light_values = []
-    for ts in timestamps:
-        hour = ts.hour
-        
-        # Luz solo durante el día (6am - 8pm)
-        if 6 <= hour <= 20:
-            # Patrón de campana centrado al mediodía
-            hour_normalized = (hour - 6) / 14  # 0 a 1 durante las horas de luz
-            light_pattern = np.sin(hour_normalized * np.pi)
-            
-            value = base_light * light_pattern + np.random.normal(0, 1000)
-        else:
-            value = np.random.normal(0, 100)  # Casi cero durante la noche
-        
-        light_values.append(max(0, value))  # No permitir valores negativos
+    # Luz (solo durante el día, 6am - 8pm, con patrón de campana centrado al mediodía)
+    daylight = (hours >= 6) & (hours <= 20)
+    light_pattern = np.sin((hours - 6) / 14 * np.pi)
+    light_values = np.where(daylight,
+                            base_light * light_pattern + light_noise,
+                            night_light_noise)  # Casi cero durante la noche
+    np.maximum(light_values, 0, out=light_values)  # No permitir valores negativos
     
     sensor_data['light'] = pd.DataFrame({
         'timestamp': timestamps,
@@ -592,30 +763,12 @@ def generate_sample_data(plant_profile, days=30):
     })
     
     # Humedad del suelo (patrón de riego)
-    soil_values = []
-    last_watering = start_date - timedelta(hours=12)  # Último riego antes del inicio
-    
-    for ts in timestamps:
-        # Calcular tiempo desde el último riego
-        hours_since_watering = (ts - last_watering).total_seconds() / 3600
-        
-        # Patrón de secado (exponencial decreciente)
-        drying_factor = np.exp(-hours_since_watering / 48)  # Secado en ~2 días
-        
-        # Valor base + patrón + ruido
-        base_level = base_moisture - 30  # Nivel base
-        watering_boost = 30  # Incremento al regar
-        moisture = base_level + watering_boost * drying_factor
-        
-        # Añadir ruido
-        moisture += np.random.normal(0, 1)
-        
-        # Regar cuando la humedad baja de cierto umbral
-        if moisture < base_moisture - 15:
-            last_watering = ts
-            moisture = base_level + watering_boost
-        
-        soil_values.append(max(0, min(100, moisture)))  # Limitar entre 0-100%
+    soil_values = simulate_soil_moisture(
+        soil_noise,
+        base_level=base_moisture - 30,  # Nivel base
+        watering_boost=30,  # Incremento al regar
+        threshold=base_moisture - 15  # Regar por debajo de este nivel
+    )
     
     sensor_data['soil_moisture'] = pd.DataFrame({
         'timestamp': timestamps,
@@ -5,21 +5,34 @@ Ejemplo de análisis automatizado con programación.
 Este script muestra cómo configurar análisis automáticos periódicos
 y enviar notificaciones por correo electrónico con los resultados.
 """
+import io
 import os
 import sys
-import json
+import gzip
+import html
+import shutil
+import string
+import atexit
 import argparse
 import smtplib
+import threading
+import multiprocessing
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 from email.mime.application import MIMEApplication
 from datetime import datetime
+from functools import lru_cache
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
 import schedule
 import time
 
-# Añadir el directorio actual al path para importar los módulos
-sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# Añadir el directorio raíz del repositorio al path (una sola vez) para importar los módulos
+_REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if _REPO_ROOT not in sys.path:
+    sys.path.insert(0, _REPO_ROOT)
 
+from mycodo_plant_analyzer._config_cache import load_config_cached, load_config_versioned
 from mycodo_plant_analyzer.data_connector import MycodoConnector
 from mycodo_plant_analyzer.data_analyzer import DataPreprocessor, GrowthAnalyzer, VisualizationGenerator
 
@@ -34,7 +47,106 @@ EMAIL_CONFIG = {
     'to_email': 'destinatario@example.com'
 }
 
-def run_analysis(config_file, plant_profile, days=30, output_dir=None):
+# Plantilla del cuerpo HTML de las notificaciones (los valores se escapan al sustituir)
+_EMAIL_BODY_TEMPLATE = string.Template("""
+        <html>
+        <body>
+            <h2>Resultados del Análisis de Planta: $profile</h2>
+            <p><strong>Fecha:</strong> $date</p>
+            <p><strong>Puntuación:</strong> $score/100 ($category)</p>
+            <p><strong>Evaluación:</strong> $message</p>
+            
+            <h3>Recomendaciones:</h3>
+            <ul>
+        $recommendations
+            </ul>
+            <p>Se adjunta el dashboard completo para más detalles.</p>
+        </body>
+        </html>
+        """)
+
+# Plantilla del correo resumen con varios perfiles (modo --all-profiles)
+_DIGEST_BODY_TEMPLATE = string.Template("""
+        <html>
+        <body>
+            <h2>Resultados del Análisis de Plantas</h2>
+            <p><strong>Fecha:</strong> $date</p>
+            
+            <table border="1" cellpadding="4" cellspacing="0">
+                <tr><th>Perfil</th><th>Puntuación</th><th>Categoría</th><th>Evaluación</th></tr>
+        $rows
+            </table>
+            <p>Se adjuntan los dashboards completos de cada perfil para más detalles.</p>
+        </body>
+        </html>
+        """)
+
+# Hilo de trabajo para los análisis programados, de modo que el bucle del programador
+# no quede bloqueado por el análisis o por el envío de correo (SMTP). Se usa un único
+# hilo porque los componentes en caché (ver _get_components) se comparten entre
+# ejecuciones y los análisis no deben solaparse.
+_EXECUTOR = ThreadPoolExecutor(max_workers=1, thread_name_prefix='analyzer')
+atexit.register(_EXECUTOR.shutdown, wait=True)
+
+# Los procesos de run_all_profiles se crean desde el hilo de _EXECUTOR; hacer
+# fork de un proceso con varios hilos puede bloquear al hijo, así que se inician
+# desde un servidor 'forkserver' (o con 'spawn')
+_PROFILE_MP_CONTEXT = multiprocessing.get_context(
+    'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+)
+
+# Sesiones SMTP reutilizables entre notificaciones, por (servidor, puerto, usuario).
+# Se reconecta tras SMTP_MAX_MESSAGES_PER_SESSION mensajes para evitar que el
+# servidor cierre sesiones demasiado largas.
+SMTP_MAX_MESSAGES_PER_SESSION = 100
+_SMTP_CACHE = {}
+_SMTP_LOCK = threading.Lock()
+
+Components = namedtuple('Components', 'connector preprocessor analyzer visualizer')
+
+def _build_components(config):
+    """
+    Crea los componentes del análisis para una configuración.
+    
+    Args:
+        config: Diccionario de configuración (con 'output_dir')
+        
+    Returns:
+        Components con el conector, el preprocesador, el analizador y el visualizador
+    """
+    # Los gráficos se dibujan en el propio proceso: cada análisis programado
+    # ya se ejecuta en su propio hilo o proceso, y un pool de renderizado de un
+    # analizador guardado en caché seguiría vivo entre ejecuciones
+    return Components(
+        connector=MycodoConnector(config=config),
+        preprocessor=DataPreprocessor(config=config),
+        analyzer=GrowthAnalyzer(config={**config, 'render_workers': 0}),
+        visualizer=VisualizationGenerator(output_dir=config['output_dir'])
+    )
+
+@lru_cache(maxsize=4)
+def _get_components(config_file, mtime_ns, output_dir):
+    """
+    Devuelve los componentes del análisis para un archivo de configuración,
+    reutilizando las instancias (y sus conexiones a Mycodo/InfluxDB) entre
+    ejecuciones programadas.
+    
+    La fecha de modificación forma parte de la clave de la caché, de modo que
+    un archivo modificado genera componentes nuevos.
+    
+    Args:
+        config_file: Ruta al archivo de configuración
+        mtime_ns: Fecha de modificación del archivo (en nanosegundos)
+        output_dir: Directorio de salida
+        
+    Returns:
+        Components con el conector, el preprocesador, el analizador y el visualizador
+    """
+    config = dict(load_config_cached(config_file))
+    config['output_dir'] = output_dir
+    return _build_components(config)
+
+def run_analysis(config_file, plant_profile, days=30, output_dir=None, config=None):
     """
     Ejecuta un análisis completo para un perfil de planta.
     
@@ -43,18 +155,23 @@ def run_analysis(config_file, plant_profile, days=30, output_dir=None):
         plant_profile: Nombre del perfil de planta
         days: Número de días de datos históricos
         output_dir: Directorio de salida (opcional)
+        config: Configuración ya cargada (opcional; evita volver a leer config_file)
         
     Returns:
         Diccionario con resultados del análisis y ruta al dashboard
     """
-    # Verificar si existe el archivo de configuración
-    if not os.path.exists(config_file):
-        print(f"Error: Archivo de configuración '{config_file}' no encontrado")
-        return None
-    
-    # Cargar configuración
-    with open(config_file, 'r') as f:
-        config = json.load(f)
+    from_file = config is None
+    if from_file:
+        # Cargar configuración (en caché mientras el archivo no cambie; copia
+        # modificable). Su versión identifica también los componentes en caché.
+        try:
+            config, config_mtime_ns = load_config_versioned(config_file)
+            config = dict(config)
+        except FileNotFoundError:
+            print(f"Error: Archivo de configuración '{config_file}' no encontrado")
+            return None
+    else:
+        config = dict(config)
     
     # Establecer directorio de salida
     if output_dir:
@@ -72,11 +189,13 @@ def run_analysis(config_file, plant_profile, days=30, output_dir=None):
     print(f"[{datetime.now()}] Iniciando análisis para perfil de planta: {plant_profile}")
     
     try:
-        # Inicializar componentes
-        connector = MycodoConnector(config=config)
-        preprocessor = DataPreprocessor(config=config)
-        analyzer = GrowthAnalyzer(config=config)
-        visualizer = VisualizationGenerator(output_dir=config['output_dir'])
+        # Inicializar componentes (reutilizados entre ejecuciones mientras el
+        # archivo de configuración no cambie)
+        if from_file:
+            components = _get_components(config_file, config_mtime_ns, config['output_dir'])
+        else:
+            components = _build_components(config)
+        connector, preprocessor, analyzer, visualizer = components
         
         # Obtener datos de sensores
         print("Obteniendo datos de sensores de Mycodo...")
@@ -88,8 +207,10 @@ def run_analysis(config_file, plant_profile, days=30, output_dir=None):
         
         # Preprocesar datos
         print("Preprocesando datos...")
-        for param, df in sensor_data.items():
-            sensor_data[param] = preprocessor.clean_data(df)
+        # (los parámetros que quedan vacíos tras la limpieza se descartan; el
+        # analizador los omitiría de todos modos)
+        cleaned = ((param, preprocessor.clean_data(df)) for param, df in sensor_data.items())
+        sensor_data = {param: df for param, df in cleaned if df is not None and not df.empty}
         
         # Realizar análisis
         print("Analizando condiciones de crecimiento...")
@@ -101,7 +222,8 @@ def run_analysis(config_file, plant_profile, days=30, output_dir=None):
         
         # Generar dashboard
         print("Generando dashboard...")
-        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+        analysis_time = datetime.now()
+        timestamp = analysis_time.strftime('%Y%m%d_%H%M%S')
         dashboard_file = visualizer.generate_dashboard(
             analysis_results,
             output_file=os.path.join(config['output_dir'], f"dashboard_{plant_profile}_{timestamp}.html")
@@ -115,7 +237,8 @@ def run_analysis(config_file, plant_profile, days=30, output_dir=None):
         return {
             'results': analysis_results,
             'dashboard_file': dashboard_file,
-            'timestamp': timestamp
+            'timestamp': timestamp,
+            'analysis_time': analysis_time
         }
         
     except Exception as e:
@@ -124,6 +247,158 @@ def run_analysis(config_file, plant_profile, days=30, output_dir=None):
         traceback.print_exc()
         return None
 
+def _get_smtp_session():
+    """
+    Obtiene una sesión SMTP autenticada para EMAIL_CONFIG, reutilizando la
+    existente mientras siga viva y no haya superado el límite de mensajes.
+    Debe llamarse con _SMTP_LOCK adquirido.
+    
+    Returns:
+        Diccionario con la conexión ('server') y los mensajes enviados ('messages')
+    """
+    key = (EMAIL_CONFIG['smtp_server'], EMAIL_CONFIG['smtp_port'], EMAIL_CONFIG['username'])
+    session = _SMTP_CACHE.get(key)
+    
+    if session is not None:
+        if session['messages'] >= SMTP_MAX_MESSAGES_PER_SESSION:
+            _close_smtp_session(_SMTP_CACHE.pop(key))
+            session = None
+        else:
+            try:
+                session['server'].noop()
+            except (smtplib.SMTPException, OSError):
+                _close_smtp_session(_SMTP_CACHE.pop(key))
+                session = None
+    
+    if session is None:
+        server = smtplib.SMTP(EMAIL_CONFIG['smtp_server'], EMAIL_CONFIG['smtp_port'])
+        try:
+            server.starttls()
+            server.login(EMAIL_CONFIG['username'], EMAIL_CONFIG['password'])
+        except Exception:
+            # No dejar abierta la conexión si falla el cifrado o la autenticación
+            server.close()
+            raise
+        session = {'server': server, 'messages': 0}
+        _SMTP_CACHE[key] = session
+    
+    return session
+
+def _close_smtp_session(session):
+    """Cierra una sesión SMTP ignorando errores de una conexión ya caída."""
+    try:
+        session['server'].quit()
+    except (smtplib.SMTPException, OSError):
+        pass
+
+def _close_smtp_sessions():
+    """Cierra todas las sesiones SMTP abiertas."""
+    with _SMTP_LOCK:
+        for session in _SMTP_CACHE.values():
+            _close_smtp_session(session)
+        _SMTP_CACHE.clear()
+
+atexit.register(_close_smtp_sessions)
+
+def _send_message(msg):
+    """
+    Envía un mensaje por la sesión SMTP compartida.
+    
+    Args:
+        msg: Mensaje de correo a enviar
+    """
+    with _SMTP_LOCK:
+        session = _get_smtp_session()
+        try:
+            session['server'].send_message(msg)
+        except smtplib.SMTPServerDisconnected:
+            # Descartar la sesión para reconectar en el siguiente envío
+            _SMTP_CACHE.clear()
+            raise
+        session['messages'] += 1
+
+def run_all_profiles(config_file, profiles=None, days=30, output_dir=None, max_workers=None):
+    """
+    Ejecuta el análisis de varios perfiles de planta en paralelo (un proceso por perfil).
+    
+    Args:
+        config_file: Ruta al archivo de configuración
+        profiles: Lista de perfiles a analizar (por defecto, todos los de la configuración)
+        days: Número de días de datos históricos
+        output_dir: Directorio de salida (opcional)
+        max_workers: Número máximo de procesos (por defecto, número de CPUs)
+        
+    Returns:
+        Diccionario {perfil: resultado de run_analysis} (None si el análisis falló)
+    """
+    # Se carga la configuración una sola vez y se envía ya parseada a los procesos
+    try:
+        config = dict(load_config_cached(config_file))
+    except FileNotFoundError:
+        print(f"Error: Archivo de configuración '{config_file}' no encontrado")
+        return {}
+    if profiles is None:
+        profiles = list(config.get('plant_profiles', {}))
+    if not profiles:
+        print("No hay perfiles de planta para analizar")
+        return {}
+    
+    max_workers = min(max_workers or os.cpu_count() or 1, len(profiles))
+    results = {}
+    with ProcessPoolExecutor(max_workers=max_workers, mp_context=_PROFILE_MP_CONTEXT) as executor:
+        futures = {
+            executor.submit(run_analysis, config_file, profile, days, output_dir, config): profile
+            for profile in profiles
+        }
+        for future in as_completed(futures):
+            profile = futures[future]
+            try:
+                results[profile] = future.result()
+            except Exception as e:
+                print(f"Error durante el análisis de {profile}: {str(e)}")
+                results[profile] = None
+    
+    return results
+
+def _gzip_file(path, chunk_size=1 << 16):
+    """
+    Comprime un archivo con gzip leyéndolo por bloques.
+    
+    Args:
+        path: Ruta al archivo a comprimir
+        chunk_size: Tamaño de cada bloque de lectura (bytes)
+        
+    Returns:
+        Contenido comprimido (bytes)
+    """
+    buffer = io.BytesIO()
+    with open(path, 'rb') as src, gzip.GzipFile(fileobj=buffer, mode='wb', mtime=0) as dst:
+        shutil.copyfileobj(src, dst, chunk_size)
+    return buffer.getvalue()
+
+def _attach_dashboard(msg, dashboard_file):
+    """
+    Adjunta un dashboard comprimido (.html.gz) a un mensaje. El HTML se comprime
+    por bloques para no mantener en memoria el archivo completo además de su
+    versión base64.
+    
+    Args:
+        msg: Mensaje MIMEMultipart
+        dashboard_file: Ruta al archivo HTML del dashboard
+        
+    Returns:
+        True si se adjuntó el dashboard, False si el archivo no existe
+    """
+    try:
+        attachment = MIMEApplication(_gzip_file(dashboard_file), _subtype='gzip')
+    except FileNotFoundError:
+        return False
+    
+    attachment.add_header('Content-Disposition', 'attachment', 
+                         filename=os.path.basename(dashboard_file) + '.gz')
+    msg.attach(attachment)
+    return True
+
 def send_email_notification(analysis_result, plant_profile):
     """
     Envía una notificación por correo electrónico con los resultados del análisis.
@@ -154,56 +429,93 @@ def send_email_notification(analysis_result, plant_profile):
         category = overall.get('category', 'desconocido').upper()
         message = overall.get('message', 'No disponible')
         
-        # Crear cuerpo del mensaje
-        body = f"""
-        <html>
-        <body>
-            <h2>Resultados del Análisis de Planta: {plant_profile}</h2>
-            <p><strong>Fecha:</strong> {datetime.now().strftime('%Y-%m-%d %H:%M')}</p>
-            <p><strong>Puntuación:</strong> {score:.1f}/100 ({category})</p>
-            <p><strong>Evaluación:</strong> {message}</p>
-            
-            <h3>Recomendaciones:</h3>
-            <ul>
-        """
-        
-        # Añadir recomendaciones
+        # Lista de recomendaciones (escapadas, ya que pueden contener texto arbitrario)
         recommendations = overall.get('recommendations', [])
-        if recommendations:
-            for rec in recommendations:
-                body += f"<li>{rec}</li>"
-        else:
-            body += "<li>No hay recomendaciones disponibles</li>"
+        recommendations_html = ''.join(
+            f"<li>{html.escape(str(rec))}</li>" for rec in recommendations
+        ) or "<li>No hay recomendaciones disponibles</li>"
         
-        body += """
-            </ul>
-            <p>Se adjunta el dashboard completo para más detalles.</p>
-        </body>
-        </html>
-        """
+        # Crear cuerpo del mensaje
+        body = _EMAIL_BODY_TEMPLATE.safe_substitute(
+            profile=html.escape(plant_profile),
+            date=analysis_result['analysis_time'].strftime('%Y-%m-%d %H:%M'),
+            score=f"{score:.1f}",
+            category=html.escape(category),
+            message=html.escape(message),
+            recommendations=recommendations_html
+        )
         
         # Adjuntar cuerpo HTML
         msg.attach(MIMEText(body, 'html'))
         
         # Adjuntar dashboard
-        if os.path.exists(analysis_result['dashboard_file']):
-            with open(analysis_result['dashboard_file'], 'rb') as f:
-                attachment = MIMEApplication(f.read(), _subtype='html')
-                attachment.add_header('Content-Disposition', 'attachment', 
-                                     filename=os.path.basename(analysis_result['dashboard_file']))
-                msg.attach(attachment)
+        _attach_dashboard(msg, analysis_result['dashboard_file'])
         
-        # Enviar correo
-        with smtplib.SMTP(EMAIL_CONFIG['smtp_server'], EMAIL_CONFIG['smtp_port']) as server:
-            server.starttls()
-            server.login(EMAIL_CONFIG['username'], EMAIL_CONFIG['password'])
-            server.send_message(msg)
+        # Enviar correo (reutilizando la conexión SMTP si sigue abierta)
+        _send_message(msg)
         
         print(f"Notificación enviada a {EMAIL_CONFIG['to_email']}")
         
     except Exception as e:
         print(f"Error al enviar correo: {str(e)}")
 
+def send_digest_notification(analysis_results):
+    """
+    Envía un único correo con el resumen de varios perfiles de planta y un
+    dashboard adjunto por perfil.
+    
+    Args:
+        analysis_results: Diccionario {perfil: resultado del análisis}
+    """
+    if not EMAIL_CONFIG['enabled']:
+        print("Notificaciones por correo electrónico deshabilitadas")
+        return
+    
+    analysis_results = {profile: result for profile, result in analysis_results.items() if result}
+    if not analysis_results:
+        print("No hay resultados para enviar por correo")
+        return
+    
+    try:
+        # Crear mensaje
+        msg = MIMEMultipart()
+        msg['From'] = EMAIL_CONFIG['from_email']
+        msg['To'] = EMAIL_CONFIG['to_email']
+        # Fecha del resumen: la del último análisis incluido, para que coincida
+        # con los dashboards adjuntos
+        analysis_time = max(result['analysis_time'] for result in analysis_results.values())
+        msg['Subject'] = f"Análisis de Plantas: {len(analysis_results)} perfiles - {analysis_time.strftime('%Y%m%d_%H%M%S')}"
+        
+        # Una fila de la tabla por perfil
+        rows = []
+        for plant_profile, analysis_result in analysis_results.items():
+            overall = analysis_result['results'].get('overall_analysis', {})
+            rows.append(
+                f"<tr><td>{html.escape(plant_profile)}</td>"
+                f"<td>{overall.get('overall_score', 0):.1f}/100</td>"
+                f"<td>{html.escape(overall.get('category', 'desconocido').upper())}</td>"
+                f"<td>{html.escape(overall.get('message', 'No disponible'))}</td></tr>"
+            )
+        
+        # Crear cuerpo del mensaje
+        body = _DIGEST_BODY_TEMPLATE.safe_substitute(
+            date=analysis_time.strftime('%Y-%m-%d %H:%M'),
+            rows=''.join(rows)
+        )
+        msg.attach(MIMEText(body, 'html'))
+        
+        # Adjuntar los dashboards
+        for analysis_result in analysis_results.values():
+            _attach_dashboard(msg, analysis_result['dashboard_file'])
+        
+        # Enviar un solo correo para todos los perfiles
+        _send_message(msg)
+        
+        print(f"Resumen de {len(analysis_results)} perfiles enviado a {EMAIL_CONFIG['to_email']}")
+        
+    except Exception as e:
+        print(f"Error al enviar correo: {str(e)}")
+
 def scheduled_job(config_file, plant_profile, days=30, output_dir=None):
     """Trabajo programado para ejecutar análisis y enviar notificaciones."""
     print(f"\n[{datetime.now()}] Ejecutando análisis programado para {plant_profile}")
@@ -211,13 +523,24 @@ def scheduled_job(config_file, plant_profile, days=30, output_dir=None):
     if result:
         send_email_notification(result, plant_profile)
 
+def scheduled_all_profiles_job(config_file, days=30, output_dir=None, max_workers=None):
+    """Trabajo programado para analizar todos los perfiles y enviar notificaciones."""
+    print(f"\n[{datetime.now()}] Ejecutando análisis programado para todos los perfiles")
+    results = run_all_profiles(config_file, days=days, output_dir=output_dir, max_workers=max_workers)
+    if any(results.values()):
+        send_digest_notification(results)
+
 def main():
     """Función principal para configurar análisis programados."""
     parser = argparse.ArgumentParser(description='Análisis automatizado de plantas con Mycodo')
     parser.add_argument('--config', type=str, default='config/config.json',
                         help='Ruta al archivo de configuración')
-    parser.add_argument('--profile', type=str, required=True,
+    parser.add_argument('--profile', type=str, default=None,
                         help='Perfil de planta a utilizar')
+    parser.add_argument('--all-profiles', action='store_true',
+                        help='Analizar en paralelo todos los perfiles de la configuración')
+    parser.add_argument('--workers', type=int, default=None,
+                        help='Número de procesos para --all-profiles (por defecto: número de CPUs)')
     parser.add_argument('--days', type=int, default=30,
                         help='Número de días de datos históricos')
     parser.add_argument('--output', type=str, default=None,
@@ -228,27 +551,37 @@ def main():
                         help='Ejecutar análisis inmediatamente')
     
     args = parser.parse_args()
+    if not args.profile and not args.all_profiles:
+        parser.error('se requiere --profile o --all-profiles')
     
     # Configurar trabajo programado
     interval_hours = max(1, args.interval)  # Mínimo 1 hora
-    print(f"Configurando análisis automático cada {interval_hours} horas para {args.profile}")
+    if args.all_profiles:
+        print(f"Configurando análisis automático cada {interval_hours} horas para todos los perfiles")
+        job = (scheduled_all_profiles_job, args.config, args.days, args.output, args.workers)
+    else:
+        print(f"Configurando análisis automático cada {interval_hours} horas para {args.profile}")
+        job = (scheduled_job, args.config, args.profile, args.days, args.output)
     
     # Programar trabajo
-    schedule.every(interval_hours).hours.do(
-        scheduled_job, args.config, args.profile, args.days, args.output
-    )
+    schedule.every(interval_hours).hours.do(_EXECUTOR.submit, *job)
     
     # Ejecutar inmediatamente si se solicita
     if args.run_now:
         print("Ejecutando análisis inicial...")
-        scheduled_job(args.config, args.profile, args.days, args.output)
+        _EXECUTOR.submit(*job)
     
     # Bucle principal
     print(f"Servicio de análisis iniciado. Presione Ctrl+C para detener.")
     try:
         while True:
+            # Dormir hasta el siguiente trabajo (máximo 1 hora para responder a Ctrl+C/SIGTERM)
+            idle = schedule.idle_seconds()
+            if idle is None:
+                break  # No quedan trabajos programados
+            if idle > 0:
+                time.sleep(min(idle, 3600))
             schedule.run_pending()
-            time.sleep(60)  # Verificar cada minuto
     except KeyboardInterrupt:
         print("Servicio de análisis detenido.")
 
@@ -7,30 +7,32 @@ para analizar datos de plantas desde Python.
 """
 import os
 import sys
-import json
-from datetime import datetime
+import numpy as np
+import pandas as pd
+from datetime import datetime, timedelta
 
-# Añadir el directorio actual al path para importar los módulos
-sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# Añadir el directorio raíz del repositorio al path (una sola vez) para importar los módulos
+_REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if _REPO_ROOT not in sys.path:
+    sys.path.insert(0, _REPO_ROOT)
 
+from mycodo_plant_analyzer._config_cache import load_config_cached
 from mycodo_plant_analyzer.data_connector import MycodoConnector
 from mycodo_plant_analyzer.data_analyzer import DataPreprocessor, GrowthAnalyzer, VisualizationGenerator
+from _sample_data import simulate_soil_moisture
 
 def main():
     """Función principal para demostrar el uso básico del sistema."""
     # Configuración
-    config_file = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 
-                              'config', 'config.example.json')
+    config_file = os.path.join(_REPO_ROOT, 'config', 'config.example.json')
     
-    # Verificar si existe el archivo de configuración
-    if not os.path.exists(config_file):
+    # Cargar configuración (en caché mientras el archivo no cambie; copia modificable)
+    try:
+        config = dict(load_config_cached(config_file))
+    except FileNotFoundError:
         print(f"Error: Archivo de configuración '{config_file}' no encontrado")
         sys.exit(1)
     
-    # Cargar configuración
-    with open(config_file, 'r') as f:
-        config = json.load(f)
-    
     # Establecer directorio de salida
     output_dir = os.path.join(os.getcwd(), 'output')
     os.makedirs(output_dir, exist_ok=True)
@@ -106,125 +108,75 @@ def main():
         traceback.print_exc()
         sys.exit(1)
 
-def generate_sample_data(plant_profile, days=30):
+def generate_sample_data(plant_profile, days=30, seed=None):
     """
     Genera datos de muestra para demostración.
     
     Args:
         plant_profile: Nombre del perfil de planta
         days: Número de días de datos históricos
+        seed: Semilla para el generador aleatorio (opcional, para datos reproducibles)
         
     Returns:
         Diccionario con DataFrames de diferentes sensores
     """
-    import pandas as pd
-    import numpy as np
-    from datetime import datetime, timedelta
-    
     # Fecha de inicio (hace X días)
     start_date = datetime.now() - timedelta(days=days)
     
-    # Generar timestamps
-    timestamps = [start_date + timedelta(hours=i) for i in range(days * 24)]
+    # Generar timestamps (una muestra por hora) como array datetime64, sin inferencia de tipos
+    n = days * 24
+    timestamps64 = np.datetime64(start_date, 'us') + np.arange(n, dtype='timedelta64[h]')
+    timestamps = pd.DatetimeIndex(timestamps64)
+    idx = np.arange(n)
+    hours = timestamps64.astype('datetime64[h]').astype(np.int64) % 24
     
-    # Generar datos para diferentes parámetros
+    # Un único generador para todo el ruido (más rápido que el RandomState global)
+    rng = np.random.default_rng(seed)
+    
+    # Generar datos para diferentes parámetros (valores en float32: la mitad de memoria)
     sensor_data = {}
     
-    # Temperatura (patrón diario con tendencia creciente)
-    temp_values = []
-    for i, ts in enumerate(timestamps):
-        # Patrón diario (más caliente durante el día, más frío durante la noche)
-        hour = ts.hour
-        daily_pattern = 3 * np.sin(hour * np.pi / 12)
-        
-        # Tendencia creciente leve
-        trend = i * 0.001
-        
-        # Valor base + patrón + tendencia + ruido
-        base_temp = 22
-        noise = np.random.normal(0, 0.5)
-        value = base_temp + daily_pattern + trend + noise
-        
-        temp_values.append(value)
+    # Temperatura (patrón diario con tendencia creciente leve)
+    # Valor base + patrón diario (más caliente durante el día) + tendencia + ruido
+    base_temp = 22
+    temp_values = (base_temp + 3 * np.sin(hours * np.pi / 12) + idx * 0.001
+                   + rng.standard_normal(n) * 0.5)
     
     sensor_data['temperature'] = pd.DataFrame({
         'timestamp': timestamps,
-        'value': temp_values
+        'value': np.asarray(temp_values, dtype=np.float32)
     })
     
-    # Humedad (patrón inverso a temperatura)
-    humidity_values = []
-    for i, ts in enumerate(timestamps):
-        hour = ts.hour
-        daily_pattern = -5 * np.sin(hour * np.pi / 12)  # Inverso a temperatura
-        
-        # Tendencia decreciente leve
-        trend = -i * 0.0005
-        
-        # Valor base + patrón + tendencia + ruido
-        base_humidity = 70
-        noise = np.random.normal(0, 1)  # Más variabilidad
-        value = base_humidity + daily_pattern + trend + noise
-        
-        humidity_values.append(value)
+    # Humedad (patrón inverso a temperatura con tendencia decreciente leve, más variabilidad)
+    base_humidity = 70
+    humidity_values = (base_humidity - 5 * np.sin(hours * np.pi / 12) - idx * 0.0005
+                       + rng.standard_normal(n))
     
     sensor_data['humidity'] = pd.DataFrame({
         'timestamp': timestamps,
-        'value': humidity_values
+        'value': np.asarray(humidity_values, dtype=np.float32)
     })
     
-    # Luz (solo durante el día)
-    light_values = []
-    for ts in timestamps:
-        hour = ts.hour
-        
-        # Luz solo durante el día (6am - 8pm)
-        if 6 <= hour <= 20:
-            # Patrón de campana centrado al mediodía
-            hour_normalized = (hour - 6) / 14  # 0 a 1 durante las horas de luz
-            light_pattern = np.sin(hour_normalized * np.pi)
-            
-            base_light = 20000
-            value = base_light * light_pattern + np.random.normal(0, 1000)
-        else:
-            value = np.random.normal(0, 100)  # Casi cero durante la noche
-        
-        light_values.append(max(0, value))  # No permitir valores negativos
+    # Luz (solo durante el día, 6am - 8pm, con patrón de campana centrado al mediodía)
+    base_light = 20000
+    daylight = (hours >= 6) & (hours <= 20)
+    light_pattern = np.sin((hours - 6) / 14 * np.pi)
+    light_values = np.where(daylight,
+                            base_light * light_pattern + rng.standard_normal(n) * 1000,
+                            rng.standard_normal(n) * 100)  # Casi cero durante la noche
+    light_values = np.clip(light_values, 0, None)  # No permitir valores negativos
     
     sensor_data['light'] = pd.DataFrame({
         'timestamp': timestamps,
-        'value': light_values
+        'value': np.asarray(light_values, dtype=np.float32)
     })
     
     # Humedad del suelo (patrón de riego)
-    soil_values = []
-    last_watering = start_date - timedelta(hours=12)  # Último riego antes del inicio
-    
-    for ts in timestamps:
-        # Calcular tiempo desde el último riego
-        hours_since_watering = (ts - last_watering).total_seconds() / 3600
-        
-        # Patrón de secado (exponencial decreciente)
-        drying_factor = np.exp(-hours_since_watering / 48)  # Secado en ~2 días
-        
-        # Valor base + patrón + ruido
-        base_moisture = 40  # Nivel base
-        watering_boost = 35  # Incremento al regar
-        moisture = base_moisture + watering_boost * drying_factor
-        
-        # Añadir ruido
-        moisture += np.random.normal(0, 1)
-        
-        # Regar cuando la humedad baja de cierto umbral
-        if moisture < 50:
-            last_watering = ts
-            moisture = base_moisture + watering_boost
-        
-        soil_values.append(max(0, min(100, moisture)))  # Limitar entre 0-100%
+    soil_values = simulate_soil_moisture(rng.standard_normal(n))
     
     sensor_data['soil_moisture'] = pd.DataFrame({
         'timestamp': timestamps,
-        'value': soil_values
+        'value': np.asarray(soil_values, dtype=np.float32)
     })
     
     return sensor_data
@@ -1,15 +1,37 @@
 #!/usr/bin/env python3
 """
 Módulo de inicialización para el paquete mycodo_plant_analyzer.
+
+Las clases se importan al primer uso, de modo que importar el paquete (p. ej.
+al ejecutar `mycodo-plant-analyzer --help`) no carga pandas, scipy ni matplotlib.
 """
-from mycodo_plant_analyzer.data_connector import MycodoConnector
-from mycodo_plant_analyzer.data_analyzer import (
-    DataPreprocessor, 
-    GrowthAnalyzer, 
-    VisualizationGenerator
-)
+import importlib
+
+# Nombre exportado -> (módulo, atributo)
+_EXPORTS = {
+    'MycodoConnector': ('mycodo_plant_analyzer.data_connector', 'MycodoConnector'),
+    'DataPreprocessor': ('mycodo_plant_analyzer.data_analyzer', 'DataPreprocessor'),
+    'GrowthAnalyzer': ('mycodo_plant_analyzer.data_analyzer', 'GrowthAnalyzer'),
+    'VisualizationGenerator': ('mycodo_plant_analyzer.data_analyzer', 'VisualizationGenerator'),
+}
+
+# run_analyzer solo importa módulos estándar hasta que se ejecuta
 from mycodo_plant_analyzer.run_analyzer import main as run_analyzer
 
+__all__ = list(_EXPORTS) + ['run_analyzer']
+
 __version__ = '0.1.0'
 __author__ = 'Jorge'
 __email__ = 'jorge1125@example.com'
+
+def __getattr__(name):
+    """Importa bajo demanda las clases exportadas por el paquete."""
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    module_name, attr = _EXPORTS[name]
+    value = getattr(importlib.import_module(module_name), attr)
+    globals()[name] = value
+    return value
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
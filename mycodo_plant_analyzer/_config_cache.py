@@ -0,0 +1,65 @@
+"""
+Módulo para la carga en caché de archivos de configuración JSON.
+"""
+import os
+import json
+from functools import lru_cache
+from types import MappingProxyType
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+@lru_cache(maxsize=8)
+def _load_config(path, mtime_ns):
+    """
+    Lee y parsea un archivo de configuración JSON.
+    
+    La fecha de modificación forma parte de la clave de la caché, de modo que
+    un archivo modificado se vuelve a leer automáticamente.
+    
+    Args:
+        path: Ruta al archivo de configuración JSON
+        mtime_ns: Fecha de modificación del archivo (en nanosegundos)
+    
+    Returns:
+        Vista de solo lectura de la configuración
+    """
+    with open(path, 'rb') as f:
+        data = f.read()
+    
+    # orjson (si está disponible) parsea bastante más rápido que json
+    if orjson is not None:
+        return MappingProxyType(orjson.loads(data))
+    return MappingProxyType(json.loads(data))
+
+def load_config_cached(path):
+    """
+    Carga un archivo de configuración JSON, reutilizando el resultado mientras
+    el archivo no cambie.
+    
+    Args:
+        path: Ruta al archivo de configuración JSON
+    
+    Returns:
+        Vista de solo lectura de la configuración (usar dict() para obtener
+        una copia modificable)
+    """
+    return load_config_versioned(path)[0]
+
+def load_config_versioned(path):
+    """
+    Como load_config_cached, pero devuelve también la fecha de modificación
+    usada como versión, para que el llamador pueda usarla en sus propias
+    cachés sin volver a consultar el archivo.
+    
+    Args:
+        path: Ruta al archivo de configuración JSON
+    
+    Returns:
+        Tupla (vista de solo lectura de la configuración, fecha de
+        modificación del archivo en nanosegundos)
+    """
+    mtime_ns = os.stat(path).st_mtime_ns
+    return _load_config(path, mtime_ns), mtime_ns
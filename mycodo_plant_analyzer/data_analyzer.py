@@ -3,11 +3,308 @@ Módulo para el preprocesamiento y análisis de datos de sensores.
 """
 import numpy as np
 import pandas as pd
-import matplotlib.pyplot as plt
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg
 from scipy import stats, signal
 from datetime import datetime, timedelta
 import os
 import json
+import shutil
+import threading
+from html import escape
+import multiprocessing
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+try:
+    from numba import njit
+except ImportError:
+    njit = None
+
+try:
+    import numexpr as ne
+except ImportError:
+    ne = None
+
+_NS_PER_DAY = 86400 * 10**9
+
+# Los gráficos se dibujan con Figure y el lienzo Agg, sin pyplot: no dependen
+# del backend configurado por el usuario ni se registran en el estado global, de
+# modo que pueden crearse fuera del hilo principal. matplotlib no garantiza ser
+# thread-safe, así que los gráficos del proceso actual se dibujan de uno en uno.
+_RENDER_LOCK = threading.Lock()
+
+# Los procesos de renderizado se crean al enviar trabajos desde los hilos de
+# análisis; hacer fork de un proceso con varios hilos puede bloquear al hijo,
+# así que se inician desde un servidor 'forkserver' (o con 'spawn')
+_RENDER_MP_CONTEXT = multiprocessing.get_context(
+    'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+)
+
+# Recomendaciones por parámetro: (texto para aumentar, texto para reducir, unidad)
+_RECOMMENDATION_TEMPLATES = {
+    'temperature': ("Aumentar la temperatura. Actualmente está por debajo",
+                    "Reducir la temperatura. Actualmente está por encima", '°C'),
+    'humidity': ("Aumentar la humedad. Actualmente está por debajo",
+                 "Reducir la humedad. Actualmente está por encima", '%'),
+    'light': ("Aumentar la exposición a la luz. Actualmente está por debajo",
+              "Reducir la exposición a la luz. Actualmente está por encima", ' lux'),
+    'soil_moisture': ("Aumentar el riego. La humedad del suelo está por debajo",
+                      "Reducir el riego. La humedad del suelo está por encima", '%'),
+}
+
+# Estadísticas básicas de cada parámetro (en este orden)
+_STAT_KEYS = ('mean', 'median', 'min', 'max', 'std', 'variance')
+
+# Estados del rango óptimo codificados como enteros (3 = desconocido), con su
+# puntuación, color y texto para los títulos de los gráficos
+_STATUS_CODES = {'optimal': 0, 'acceptable': 1, 'suboptimal': 2}
+_STATUS_UNKNOWN = 3
+_STATUS_SCORES = np.array([1.0, 0.7, 0.3, 0.0])
+_STATUS_COLORS = ('green', 'lightgreen', 'red', 'gray')
+_STATUS_TITLES = ('ÓPTIMO', 'ACEPTABLE', 'SUBÓPTIMO', None)
+
+# Tendencias codificadas como enteros, con su etiqueta y color
+_TREND_CODES = {'increasing': 0, 'decreasing': 1, 'stable': 2, 'unknown': 3}
+_TREND_LABELS = ('Creciente', 'Decreciente', 'Estable', 'Desconocida')
+_TREND_COLORS = ('green', 'red', 'blue', 'gray')
+
+def _status_code(range_analysis):
+    """
+    Obtiene el código entero del estado de un análisis de rango.
+    
+    Args:
+        range_analysis: Diccionario con el análisis de rango óptimo
+        
+    Returns:
+        Código del estado (ver _STATUS_CODES; _STATUS_UNKNOWN si no se reconoce)
+    """
+    return _STATUS_CODES.get(range_analysis.get('status'), _STATUS_UNKNOWN)
+
+def _as_datetime(series):
+    """
+    Convierte una serie a datetime solo si no lo es ya.
+    
+    Args:
+        series: Serie con marcas de tiempo (datetime o texto)
+        
+    Returns:
+        Serie datetime (la misma serie si no hace falta convertirla)
+    """
+    if pd.api.types.is_datetime64_any_dtype(series):
+        return series
+    # cache=True: cada marca de tiempo distinta se interpreta una sola vez
+    return pd.to_datetime(series, cache=True)
+
+def _profile_ranges(profile):
+    """
+    Extrae los rangos óptimos de un perfil de planta.
+    
+    Args:
+        profile: Perfil de planta
+        
+    Returns:
+        Diccionario parámetro -> (mínimo, máximo, unidad)
+    """
+    return {
+        param: (param_range.get('min'), param_range.get('max'), param_range.get('unit', ''))
+        for param, param_range in profile.get('optimal_ranges', {}).items()
+    }
+
+def _daily_means_scan(day, values):
+    """
+    Calcula las medias diarias recorriendo una sola vez datos ordenados por día.
+    
+    Args:
+        day: Array int64 con el día de cada muestra (ordenado)
+        values: Array float64 con los valores (los NaN se ignoran)
+        
+    Returns:
+        Tupla (días, medias) con un elemento por día con datos
+    """
+    n = day.shape[0]
+    days = np.empty(n, dtype=np.int64)
+    means = np.empty(n, dtype=np.float64)
+    k = 0
+    current = 0
+    total = 0.0
+    count = 0
+    
+    for i in range(n):
+        value = values[i]
+        if np.isnan(value):
+            continue
+        if count > 0 and day[i] != current:
+            days[k] = current
+            means[k] = total / count
+            k += 1
+            total = 0.0
+            count = 0
+        current = day[i]
+        total += value
+        count += 1
+    
+    if count > 0:
+        days[k] = current
+        means[k] = total / count
+        k += 1
+    
+    return days[:k], means[:k]
+
+def _daily_means_numpy(day, values):
+    """
+    Calcula las medias diarias de datos ordenados por día con operaciones
+    vectorizadas de NumPy (sumas por tramos con np.add.reduceat).
+    
+    Args:
+        day: Array int64 con el día de cada muestra (ordenado)
+        values: Array float64 con los valores (los NaN se ignoran)
+        
+    Returns:
+        Tupla (días, medias) con un elemento por día con datos
+    """
+    valid = ~np.isnan(values)
+    if not valid.all():
+        day = day[valid]
+        values = values[valid]
+    if day.size == 0:
+        return day, values
+    
+    # Inicio de cada tramo de días iguales
+    starts = np.concatenate(([0], np.flatnonzero(np.diff(day)) + 1))
+    sums = np.add.reduceat(values, starts)
+    counts = np.diff(np.append(starts, day.size))
+    return day[starts], sums / counts
+
+# Con Numba, el recorrido secuencial compilado hace todo en una pasada; sin Numba,
+# un bucle en Python sería más lento que la versión vectorizada
+_daily_means = njit(cache=True)(_daily_means_scan) if njit is not None else _daily_means_numpy
+
+def _summary_stats_scan(values):
+    """
+    Calcula media, varianza muestral, mínimo y máximo en una sola pasada
+    (algoritmo de Welford para media y varianza).
+    
+    Args:
+        values: Array float64 sin NaN y con al menos un elemento
+        
+    Returns:
+        Tupla (media, varianza, mínimo, máximo); la varianza es NaN con un solo valor
+    """
+    n = values.shape[0]
+    mean = 0.0
+    m2 = 0.0
+    minimum = np.inf
+    maximum = -np.inf
+    
+    for i in range(n):
+        x = values[i]
+        delta = x - mean
+        mean += delta / (i + 1)
+        m2 += delta * (x - mean)
+        if x < minimum:
+            minimum = x
+        if x > maximum:
+            maximum = x
+    
+    variance = m2 / (n - 1) if n > 1 else np.nan
+    return mean, variance, minimum, maximum
+
+def _summary_stats_numpy(values):
+    """
+    Calcula media, varianza muestral, mínimo y máximo con reducciones de NumPy.
+    
+    Args:
+        values: Array float64 sin NaN y con al menos un elemento
+        
+    Returns:
+        Tupla (media, varianza, mínimo, máximo); la varianza es NaN con un solo valor
+    """
+    variance = values.var(ddof=1) if values.size > 1 else np.nan
+    return values.mean(), variance, values.min(), values.max()
+
+# Con Numba, una sola pasada sobre memoria en lugar de cuatro reducciones
+_summary_stats = njit(cache=True)(_summary_stats_scan) if njit is not None else _summary_stats_numpy
+
+def _linear_trend(y):
+    """
+    Ajusta una recta por mínimos cuadrados a valores equiespaciados (x = 0, 1, 2...),
+    con los mismos resultados que scipy.stats.linregress.
+    
+    Args:
+        y: Array con los valores
+        
+    Returns:
+        Tupla (pendiente, intercepto, r, p-valor)
+    """
+    n = len(y)
+    y_mean = y.mean()
+    y_dev = y - y_mean
+    
+    # Con x = 0..n-1: Σ(x - x̄)² = n(n² - 1)/12 y, como Σ(y - ȳ) = 0,
+    # Σ(x - x̄)(y - ȳ) = Σ x·(y - ȳ)
+    sxx = n * (n * n - 1) / 12.0
+    sxy = np.dot(np.arange(n, dtype=np.float64), y_dev)
+    syy = np.dot(y_dev, y_dev)
+    
+    slope = sxy / sxx
+    intercept = y_mean - slope * (n - 1) / 2.0
+    
+    if syy == 0:
+        # Serie constante: correlación indefinida
+        return slope, intercept, np.nan, np.nan
+    
+    r_value = min(1.0, max(-1.0, sxy / np.sqrt(sxx * syy)))
+    if abs(r_value) == 1.0:
+        p_value = 0.0
+    else:
+        dof = n - 2
+        t = r_value * np.sqrt(dof / ((1.0 - r_value) * (1.0 + r_value)))
+        p_value = 2 * stats.t.sf(abs(t), dof)
+    
+    return slope, intercept, r_value, p_value
+
+def _scale_values(series, offset, scale):
+    """
+    Calcula (valor - offset) / scale para toda una serie en una sola pasada,
+    con numexpr si está disponible (sin arrays intermedios y en varios hilos).
+    
+    Args:
+        series: Serie con los valores
+        offset: Valor a restar
+        scale: Divisor
+        
+    Returns:
+        Array con los valores escalados
+    """
+    values = series.to_numpy(dtype=np.float64)
+    if ne is not None:
+        return ne.evaluate('(values - offset) / scale',
+                           local_dict={'values': values, 'offset': offset, 'scale': scale})
+    return (values - offset) / scale
+
+def _bucket_modes(groups, codes, n_groups, n_categories):
+    """
+    Devuelve el código más frecuente de cada intervalo con un único bincount
+    sobre la clave combinada (intervalo, código), sin llamadas por intervalo.
+    
+    Args:
+        groups: Array int64 con el intervalo de cada fila (-1 si no tiene)
+        codes: Array int64 con los códigos categóricos (-1 para valores faltantes)
+        n_groups: Número de intervalos
+        n_categories: Número de categorías
+        
+    Returns:
+        Array con el código más frecuente de cada intervalo (el menor en caso
+        de empate) o -1 si el intervalo no tiene valores
+    """
+    valid = (groups >= 0) & (codes >= 0)
+    keys = groups[valid] * n_categories + codes[valid]
+    counts = np.bincount(keys, minlength=n_groups * n_categories).reshape(n_groups, n_categories)
+    
+    modes = counts.argmax(axis=1)
+    modes[counts[np.arange(n_groups), modes] == 0] = -1
+    return modes
 
 class DataPreprocessor:
     """
@@ -36,42 +333,77 @@ class DataPreprocessor:
         if df.empty:
             return df
         
-        # Hacer una copia para evitar modificar el original
-        df_clean = df.copy()
+        # Cada paso devuelve un DataFrame nuevo, por lo que el original no se
+        # modifica y no hace falta copiarlo entero al principio
+        df_clean = df
         
-        # Asegurar que la columna timestamp sea datetime
-        if 'timestamp' in df_clean.columns:
-            df_clean['timestamp'] = pd.to_datetime(df_clean['timestamp'])
+        # Asegurar que la columna timestamp sea datetime (solo si no lo es ya)
+        if ('timestamp' in df_clean.columns and
+                not pd.api.types.is_datetime64_any_dtype(df_clean['timestamp'])):
+            df_clean = df_clean.assign(timestamp=_as_datetime(df_clean['timestamp']))
         
-        # Ordenar por timestamp
         if 'timestamp' in df_clean.columns:
-            df_clean = df_clean.sort_values('timestamp')
-        
-        # Eliminar duplicados
-        df_clean = df_clean.drop_duplicates()
+            # Ordenar por timestamp y eliminar duplicados con una sola selección de
+            # filas. Dos filas idénticas tienen el mismo timestamp, así que solo se
+            # buscan duplicados entre las filas con timestamp repetido. La
+            # ordenación es estable: entre filas idénticas se conserva la primera,
+            # igual que con sort_values() + drop_duplicates().
+            ts = df_clean['timestamp'].to_numpy(dtype='datetime64[ns]')
+            sort_key = np.where(np.isnat(ts), np.iinfo(np.int64).max, ts.view(np.int64))  # NaT al final
+            rows = np.argsort(sort_key, kind='stable')
+            
+            sorted_key = sort_key[rows]
+            same = sorted_key[1:] == sorted_key[:-1]
+            if same.any():
+                tied = np.zeros(len(rows), dtype=bool)
+                tied[1:] |= same
+                tied[:-1] |= same
+                tied_pos = np.flatnonzero(tied)
+                duplicated = df_clean.iloc[rows[tied_pos]].duplicated().to_numpy()
+                keep = np.ones(len(rows), dtype=bool)
+                keep[tied_pos[duplicated]] = False
+                rows = rows[keep]
+            
+            df_clean = df_clean.iloc[rows]
+        else:
+            # Eliminar duplicados
+            df_clean = df_clean.drop_duplicates()
         
         # Manejar valores faltantes
         if 'value' in df_clean.columns:
             # Interpolar valores faltantes si no son demasiados
-            missing_pct = df_clean['value'].isna().mean() * 100
-            if missing_pct < 20:  # Si menos del 20% son valores faltantes
-                df_clean['value'] = df_clean['value'].interpolate(method='linear')
+            values = df_clean['value'].to_numpy(dtype=np.float64)
+            missing = np.isnan(values)
+            missing_pct = missing.mean() * 100
+            if missing.any() and missing_pct < 20:  # Si menos del 20% son valores faltantes
+                # Interpolación lineal por posición con np.interp; como en
+                # Series.interpolate, los faltantes iniciales no se rellenan y los
+                # finales toman el último valor conocido
+                positions = np.arange(len(values))
+                known = positions[~missing]
+                fill = missing & (positions > known[0])
+                values = values.copy()
+                values[fill] = np.interp(positions[fill], known, values[known])
+                df_clean = df_clean.assign(value=values)
             
             # Eliminar filas restantes con valores faltantes
             df_clean = df_clean.dropna(subset=['value'])
         
         # Detectar y eliminar valores atípicos extremos
         if 'value' in df_clean.columns and len(df_clean) > 10:
-            # Calcular límites usando IQR
-            Q1 = df_clean['value'].quantile(0.25)
-            Q3 = df_clean['value'].quantile(0.75)
+            # Calcular límites usando IQR (ambos cuartiles en una sola pasada)
+            values = df_clean['value'].to_numpy(dtype=np.float64)
+            Q1, Q3 = np.nanpercentile(values, [25, 75])
             IQR = Q3 - Q1
-            lower_bound = Q1 - 3 * IQR  # Más permisivo que el estándar 1.5*IQR
-            upper_bound = Q3 + 3 * IQR
             
-            # Filtrar valores extremos
-            df_clean = df_clean[(df_clean['value'] >= lower_bound) & 
-                               (df_clean['value'] <= upper_bound)]
+            # Con IQR nulo (valores casi constantes) no se puede distinguir un
+            # valor atípico, así que no se filtra nada
+            if IQR > 0:
+                lower_bound = Q1 - 3 * IQR  # Más permisivo que el estándar 1.5*IQR
+                upper_bound = Q3 + 3 * IQR
+                
+                # Filtrar valores extremos
+                df_clean = df_clean.iloc[(values >= lower_bound) & (values <= upper_bound)]
         
         return df_clean
     
@@ -90,30 +422,49 @@ class DataPreprocessor:
             return df
         
         # Establecer timestamp como índice
-        df_resampled = df.copy()
-        df_resampled = df_resampled.set_index('timestamp')
-        
-        # Remuestrear datos
-        resampled = df_resampled['value'].resample(freq).mean()
-        
-        # Convertir de nuevo a DataFrame
-        result = pd.DataFrame({'timestamp': resampled.index, 'value': resampled.values})
-        
-        # Restaurar otras columnas si existen
-        for col in df.columns:
-            if col not in ['timestamp', 'value']:
-                # Para columnas categóricas, usar el valor más frecuente
-                if df[col].dtype == 'object':
-                    mode_values = df_resampled[col].resample(freq).apply(
-                        lambda x: x.mode()[0] if not x.empty and len(x.mode()) > 0 else None
-                    )
-                    result[col] = [mode_values.loc[t] for t in resampled.index]
-                else:
-                    # Para columnas numéricas, usar la media
-                    mean_values = df_resampled[col].resample(freq).mean()
-                    result[col] = [mean_values.loc[t] for t in resampled.index]
+        df_resampled = df.set_index('timestamp')
+        
+        # Agregación por columna: media para 'value' y columnas numéricas; las
+        # columnas categóricas (object, texto o category) se tratan aparte sobre
+        # sus códigos enteros
+        agg = {'value': 'mean'}
+        categorical = []
+        for col in df_resampled.columns:
+            if col == 'value':
+                continue
+            dtype = df_resampled[col].dtype
+            if (dtype == 'object' or isinstance(dtype, pd.CategoricalDtype) or
+                    pd.api.types.is_string_dtype(dtype)):
+                categorical.append(col)
+            else:
+                agg[col] = 'mean'
+        
+        # Remuestrear las columnas numéricas de una vez
+        result = df_resampled[list(agg)].resample(freq).agg(agg)
+        
+        if categorical:
+            # Intervalo de cada fila: con las filas ordenadas por tiempo (y sin NaT),
+            # basta repetir cada número de intervalo tantas veces como filas tenga
+            df_categorical = df_resampled[categorical]
+            if not df_categorical.index.is_monotonic_increasing:
+                df_categorical = df_categorical[df_categorical.index.notna()].sort_index(kind='stable')
+            counts = df_categorical.resample(freq).size().to_numpy()
+            groups = np.repeat(np.arange(len(counts)), counts)
+            
+            # Valor más frecuente de cada intervalo, convertido de nuevo a su valor original
+            for col in categorical:
+                codes = pd.Categorical(df_categorical[col])
+                values = np.asarray(codes.categories, dtype=object)
+                if len(values) == 0:
+                    result[col] = None
+                    continue
+                modes = _bucket_modes(groups, codes.codes.astype(np.int64), len(counts), len(values))
+                result[col] = np.where(modes >= 0, values[modes.clip(0)], None)
+            
+            # Mantener el orden de columnas ('value' primero)
+            result = result[['value'] + [col for col in df_resampled.columns if col != 'value']]
         
-        return result
+        return result.reset_index()
     
     def normalize_data(self, df, method='minmax'):
         """
@@ -129,27 +480,28 @@ class DataPreprocessor:
         if df.empty or 'value' not in df.columns:
             return df
         
-        df_norm = df.copy()
+        # assign() añade la columna sobre un DataFrame nuevo sin copiar el original
+        df_norm = df
         
         if method == 'minmax':
             # Normalización Min-Max (escala a rango 0-1)
-            min_val = df_norm['value'].min()
-            max_val = df_norm['value'].max()
+            min_val = df['value'].min()
+            max_val = df['value'].max()
             
             if max_val > min_val:
-                df_norm['value_normalized'] = (df_norm['value'] - min_val) / (max_val - min_val)
+                df_norm = df.assign(value_normalized=_scale_values(df['value'], min_val, max_val - min_val))
             else:
-                df_norm['value_normalized'] = 0.5  # Valor constante
+                df_norm = df.assign(value_normalized=0.5)  # Valor constante
         
         elif method == 'zscore':
             # Normalización Z-score (media 0, desviación estándar 1)
-            mean = df_norm['value'].mean()
-            std = df_norm['value'].std()
+            mean = df['value'].mean()
+            std = df['value'].std()
             
             if std > 0:
-                df_norm['value_normalized'] = (df_norm['value'] - mean) / std
+                df_norm = df.assign(value_normalized=_scale_values(df['value'], mean, std))
             else:
-                df_norm['value_normalized'] = 0  # Valor constante
+                df_norm = df.assign(value_normalized=0)  # Valor constante
         
         return df_norm
 
@@ -176,9 +528,34 @@ class GrowthAnalyzer:
         # Cargar perfiles de plantas
         self.plant_profiles = self.config.get('plant_profiles', {})
         
+        # Rangos óptimos por perfil, extraídos una sola vez
+        self._profile_ranges = {
+            name: _profile_ranges(profile) for name, profile in self.plant_profiles.items()
+        }
+        
         # Directorio para visualizaciones
         self.output_dir = self.config.get('output_dir', '/tmp')
         os.makedirs(self.output_dir, exist_ok=True)
+        
+        # Procesos para renderizar gráficos en paralelo (0, por defecto:
+        # renderizar en el proceso actual; None: número de CPUs). El pool se
+        # crea al primer uso y se detiene con close().
+        self.render_workers = self.config.get('render_workers', 0)
+        self._render_pool = None
+        self._render_pool_lock = threading.Lock()
+    
+    def close(self):
+        """Detiene el pool de procesos de renderizado, si se ha creado."""
+        with self._render_pool_lock:
+            pool, self._render_pool = self._render_pool, None
+        if pool is not None:
+            pool.shutdown()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
     
     def analyze_growth_conditions(self, sensor_data, plant_profile):
         """
@@ -204,8 +581,10 @@ class GrowthAnalyzer:
                 'message': 'No se pudieron obtener datos de sensores'
             }
         
-        # Obtener perfil de planta
-        profile = self.plant_profiles[plant_profile]
+        # Obtener rangos óptimos del perfil de planta
+        ranges = self._profile_ranges.get(plant_profile)
+        if ranges is None:
+            ranges = _profile_ranges(self.plant_profiles[plant_profile])
         
         # Resultados de análisis
         analysis = {
@@ -217,72 +596,107 @@ class GrowthAnalyzer:
             'visualizations': {}
         }
         
-        # Analizar cada parámetro
-        for param, df in sensor_data.items():
-            if df.empty:
-                continue
-                
-            # Análisis de parámetros
-            param_analysis = self._analyze_parameter(df, param, profile)
-            analysis['parameter_analysis'][param] = param_analysis
+        # Gráficos pendientes (se renderizan en paralelo mientras continúa el análisis)
+        renders = {}
+        
+        # Analizar cada parámetro en su propio hilo (NumPy/pandas liberan el GIL);
+        # el pool de renderizado se crea antes para que los hilos lo compartan
+        # (sus procesos se inician sin fork, ver _RENDER_MP_CONTEXT)
+        params = [(param, df) for param, df in sensor_data.items() if not df.empty]
+        if params:
+            self._get_render_pool()
+            with ThreadPoolExecutor(max_workers=len(params)) as executor:
+                futures = {
+                    param: executor.submit(self._analyze_and_viz, df, param, ranges)
+                    for param, df in params
+                }
             
-            # Visualización de parámetros
-            viz_path = self._visualize_parameter(df, param, param_analysis, profile)
-            if viz_path:
-                analysis['visualizations'][f"{param}_analysis"] = viz_path
+            for param, future in futures.items():
+                param_analysis, render = future.result()
+                analysis['parameter_analysis'][param] = param_analysis
+                if render is not None:
+                    renders[f"{param}_analysis"] = render
         
         # Análisis general
         analysis['overall_analysis'] = self._generate_overall_analysis(analysis['parameter_analysis'])
         
         # Visualización general
-        viz_path = self._visualize_overall_analysis(analysis)
-        if viz_path:
-            analysis['visualizations']['overall_analysis'] = viz_path
+        renders['overall_analysis'] = self._visualize_overall_analysis(analysis)
+        
+        # Esperar a que terminen los gráficos
+        for key, render in renders.items():
+            try:
+                viz_path = render.result()
+            except BrokenProcessPool as e:
+                # El próximo análisis usará un pool nuevo
+                print(f"Error al generar la visualización {key}: {e}")
+                self._discard_render_pool()
+                continue
+            if viz_path:
+                analysis['visualizations'][key] = viz_path
         
         return analysis
     
-    def _analyze_parameter(self, df, param, profile):
+    def _analyze_and_viz(self, df, param, ranges):
+        """
+        Analiza un parámetro y lanza su visualización.
+        
+        Args:
+            df: DataFrame con datos del sensor
+            param: Nombre del parámetro
+            ranges: Rangos óptimos del perfil de planta (ver _profile_ranges)
+            
+        Returns:
+            Tupla (análisis del parámetro, Future con la ruta de la imagen o None)
+        """
+        param_analysis = self._analyze_parameter(df, param, ranges)
+        render = self._visualize_parameter(df, param, param_analysis, ranges)
+        return param_analysis, render
+    
+    def _analyze_parameter(self, df, param, ranges):
         """
         Analiza un parámetro específico.
         
         Args:
             df: DataFrame con datos del sensor
             param: Nombre del parámetro
-            profile: Perfil de planta
+            ranges: Rangos óptimos del perfil de planta (ver _profile_ranges)
             
         Returns:
             Diccionario con análisis del parámetro
         """
         # Obtener rango óptimo si está disponible
-        optimal_range = None
-        if 'optimal_ranges' in profile and param in profile['optimal_ranges']:
-            optimal_range = (
-                profile['optimal_ranges'][param].get('min'),
-                profile['optimal_ranges'][param].get('max')
-            )
-        
-        # Estadísticas básicas
-        stats_analysis = {
-            'mean': df['value'].mean(),
-            'median': df['value'].median(),
-            'min': df['value'].min(),
-            'max': df['value'].max(),
-            'std': df['value'].std(),
-            'variance': df['value'].var()
-        }
+        optimal_range = ranges.get(param)
+        
+        # Extraer los valores una sola vez y calcular las estadísticas con NumPy
+        # (ignorando NaN, como pandas)
+        values = df['value'].to_numpy(dtype=np.float64)
+        missing = np.isnan(values)
+        valid = values[~missing] if missing.any() else values
+        
+        # Estadísticas básicas (todas como float de Python)
+        if valid.size > 0:
+            mean, variance, minimum, maximum = _summary_stats(valid)
+            stats_analysis = dict(zip(
+                _STAT_KEYS,
+                map(float, (mean, np.median(valid), minimum, maximum, np.sqrt(variance), variance))
+            ))
+        else:
+            stats_analysis = dict.fromkeys(_STAT_KEYS, np.nan)
         
         # Análisis de rango óptimo
         range_analysis = {}
         if optimal_range:
-            min_val, max_val = optimal_range
-            in_range = df[(df['value'] >= min_val) & (df['value'] <= max_val)]
-            pct_in_range = len(in_range) / len(df) * 100 if len(df) > 0 else 0
+            min_val, max_val, _ = optimal_range
             
-            below_range = df[df['value'] < min_val]
-            above_range = df[df['value'] > max_val]
+            # Contar directamente sobre el array, sin crear DataFrames filtrados
+            n_below = np.count_nonzero(valid < min_val)
+            n_above = np.count_nonzero(valid > max_val)
+            n_in_range = valid.size - n_below - n_above
             
-            pct_below = len(below_range) / len(df) * 100 if len(df) > 0 else 0
-            pct_above = len(above_range) / len(df) * 100 if len(df) > 0 else 0
+            pct_in_range = n_in_range / len(df) * 100 if len(df) > 0 else 0
+            pct_below = n_below / len(df) * 100 if len(df) > 0 else 0
+            pct_above = n_above / len(df) * 100 if len(df) > 0 else 0
             
             range_analysis = {
                 'optimal_min': min_val,
@@ -326,19 +740,23 @@ class GrowthAnalyzer:
         # Asegurar que los datos están ordenados
         df = df.sort_values('timestamp')
         
-        # Calcular medias diarias
+        # Calcular medias diarias (día = días desde la época, en hora local)
         if 'timestamp' in df.columns:
-            df['date'] = df['timestamp'].dt.date
-            daily_avg = df.groupby('date')['value'].mean().reset_index()
+            timestamps = _as_datetime(df['timestamp'])
+            if timestamps.dt.tz is not None:
+                timestamps = timestamps.dt.tz_localize(None)
+            ts_ns = timestamps.to_numpy(dtype='datetime64[ns]')
+            valid = ~np.isnat(ts_ns)
+            day = ts_ns[valid].view(np.int64) // _NS_PER_DAY
+            values = df['value'].to_numpy(dtype=np.float64)[valid]
+            days, daily_avg = _daily_means(day, values)
         else:
             return {'trend': 'unknown', 'message': 'Formato de datos incorrecto para análisis de tendencia'}
         
         # Si tenemos suficientes días, calcular tendencia
         if len(daily_avg) >= 3:
             # Calcular pendiente de la línea de tendencia
-            x = np.arange(len(daily_avg))
-            y = daily_avg['value'].values
-            slope, intercept, r_value, p_value, std_err = stats.linregress(x, y)
+            slope, intercept, r_value, p_value = _linear_trend(daily_avg)
             
             # Determinar tendencia
             if abs(slope) < 0.01:  # Umbral para considerar estable
@@ -353,9 +771,9 @@ class GrowthAnalyzer:
             
             # Calcular velocidad de cambio
             if len(daily_avg) > 1:
-                first_value = daily_avg['value'].iloc[0]
-                last_value = daily_avg['value'].iloc[-1]
-                days_diff = (daily_avg['date'].iloc[-1] - daily_avg['date'].iloc[0]).days
+                first_value = daily_avg[0]
+                last_value = daily_avg[-1]
+                days_diff = int(days[-1] - days[0])
                 
                 if days_diff > 0:
                     change_rate = (last_value - first_value) / days_diff
@@ -391,22 +809,16 @@ class GrowthAnalyzer:
         # Calcular puntuación general
         scores = []
         
-        # Puntuación de parámetros
-        param_scores = []
-        for param, analysis in parameter_analysis.items():
-            if 'range_analysis' in analysis and 'status' in analysis['range_analysis']:
-                status = analysis['range_analysis']['status']
-                if status == 'optimal':
-                    param_scores.append(1.0)
-                elif status == 'acceptable':
-                    param_scores.append(0.7)
-                elif status == 'suboptimal':
-                    param_scores.append(0.3)
-                else:
-                    param_scores.append(0.0)
+        # Puntuación de parámetros (por código de estado)
+        status_codes = [
+            _status_code(analysis['range_analysis'])
+            for analysis in parameter_analysis.values()
+            if 'range_analysis' in analysis and 'status' in analysis['range_analysis']
+        ]
         
-        if param_scores:
-            avg_param_score = sum(param_scores) / len(param_scores)
+        if status_codes:
+            param_scores = _STATUS_SCORES[status_codes]
+            avg_param_score = float(param_scores.sum()) / len(param_scores)
             scores.append(avg_param_score)
         
         # Calcular puntuación general
@@ -453,38 +865,24 @@ class GrowthAnalyzer:
         
         for param, analysis in parameter_analysis.items():
             if 'range_analysis' in analysis and 'status' in analysis['range_analysis']:
-                status = analysis['range_analysis']['status']
-                
-                if status != 'optimal':
+                if _status_code(analysis['range_analysis']) != _STATUS_CODES['optimal']:
                     range_data = analysis['range_analysis']
                     
+                    increase, decrease, unit = _RECOMMENDATION_TEMPLATES.get(param, (
+                        f"Aumentar {param}. Actualmente está por debajo",
+                        f"Reducir {param}. Actualmente está por encima",
+                        ''
+                    ))
+                    
                     if 'pct_below_range' in range_data and range_data['pct_below_range'] > 20:
-                        if param == 'temperature':
-                            recommendations.append(f"Aumentar la temperatura. Actualmente está por debajo del rango óptimo ({range_data['optimal_min']}°C) durante un {range_data['pct_below_range']:.1f}% del tiempo.")
-                        elif param == 'humidity':
-                            recommendations.append(f"Aumentar la humedad. Actualmente está por debajo del rango óptimo ({range_data['optimal_min']}%) durante un {range_data['pct_below_range']:.1f}% del tiempo.")
-                        elif param == 'light':
-                            recommendations.append(f"Aumentar la exposición a la luz. Actualmente está por debajo del rango óptimo ({range_data['optimal_min']} lux) durante un {range_data['pct_below_range']:.1f}% del tiempo.")
-                        elif param == 'soil_moisture':
-                            recommendations.append(f"Aumentar el riego. La humedad del suelo está por debajo del rango óptimo ({range_data['optimal_min']}%) durante un {range_data['pct_below_range']:.1f}% del tiempo.")
-                        else:
-                            recommendations.append(f"Aumentar {param}. Actualmente está por debajo del rango óptimo ({range_data['optimal_min']}) durante un {range_data['pct_below_range']:.1f}% del tiempo.")
+                        recommendations.append(f"{increase} del rango óptimo ({range_data['optimal_min']}{unit}) durante un {range_data['pct_below_range']:.1f}% del tiempo.")
                     
                     if 'pct_above_range' in range_data and range_data['pct_above_range'] > 20:
-                        if param == 'temperature':
-                            recommendations.append(f"Reducir la temperatura. Actualmente está por encima del rango óptimo ({range_data['optimal_max']}°C) durante un {range_data['pct_above_range']:.1f}% del tiempo.")
-                        elif param == 'humidity':
-                            recommendations.append(f"Reducir la humedad. Actualmente está por encima del rango óptimo ({range_data['optimal_max']}%) durante un {range_data['pct_above_range']:.1f}% del tiempo.")
-                        elif param == 'light':
-                            recommendations.append(f"Reducir la exposición a la luz. Actualmente está por encima del rango óptimo ({range_data['optimal_max']} lux) durante un {range_data['pct_above_range']:.1f}% del tiempo.")
-                        elif param == 'soil_moisture':
-                            recommendations.append(f"Reducir el riego. La humedad del suelo está por encima del rango óptimo ({range_data['optimal_max']}%) durante un {range_data['pct_above_range']:.1f}% del tiempo.")
-                        else:
-                            recommendations.append(f"Reducir {param}. Actualmente está por encima del rango óptimo ({range_data['optimal_max']}) durante un {range_data['pct_above_range']:.1f}% del tiempo.")
+                        recommendations.append(f"{decrease} del rango óptimo ({range_data['optimal_max']}{unit}) durante un {range_data['pct_above_range']:.1f}% del tiempo.")
         
         return recommendations
     
-    def _visualize_parameter(self, df, param, param_analysis, profile):
+    def _visualize_parameter(self, df, param, param_analysis, ranges):
         """
         Genera visualización para un parámetro.
         
@@ -492,103 +890,31 @@ class GrowthAnalyzer:
             df: DataFrame con datos del sensor
             param: Nombre del parámetro
             param_analysis: Análisis del parámetro
-            profile: Perfil de planta
+            ranges: Rangos óptimos del perfil de planta (ver _profile_ranges)
             
         Returns:
-            Ruta al archivo de imagen guardado
+            Future con la ruta al archivo de imagen guardado (o None si no hay datos)
         """
         if df.empty:
             return None
-            
-        # Crear figura
-        plt.figure(figsize=(12, 6))
-        
-        # Gráfico principal de datos
-        plt.plot(df['timestamp'], df['value'], 'b-', linewidth=1.5)
-        
-        # Añadir rango óptimo si está disponible
-        if 'range_analysis' in param_analysis and 'optimal_min' in param_analysis['range_analysis']:
-            min_val = param_analysis['range_analysis']['optimal_min']
-            max_val = param_analysis['range_analysis']['optimal_max']
-            
-            plt.axhspan(min_val, max_val, alpha=0.2, color='green', label='Rango óptimo')
-            plt.axhline(y=min_val, color='g', linestyle='--', alpha=0.7)
-            plt.axhline(y=max_val, color='g', linestyle='--', alpha=0.7)
         
-        # Añadir tendencia si está disponible
-        if 'trend_analysis' in param_analysis and 'slope' in param_analysis['trend_analysis']:
-            # Calcular línea de tendencia
-            x = np.arange(len(df))
-            slope = param_analysis['trend_analysis']['slope']
-            intercept = df['value'].iloc[0]
-            trend_line = intercept + slope * x
-            
-            # Convertir índices a timestamps para graficar
-            trend_timestamps = df['timestamp'].iloc[0] + pd.to_timedelta(x * np.mean(np.diff(df.index)), unit='s')
-            
-            plt.plot(trend_timestamps, trend_line, 'r--', linewidth=1.5, label='Tendencia')
+        unit = ranges[param][2] if param in ranges else ''
         
-        # Configurar etiquetas y título
-        unit = ''
-        if 'optimal_ranges' in profile and param in profile['optimal_ranges']:
-            unit = profile['optimal_ranges'][param].get('unit', '')
-        
-        plt.xlabel('Fecha/Hora')
-        plt.ylabel(f'{param.capitalize()} ({unit})' if unit else param.capitalize())
-        
-        # Determinar título basado en estado
-        title = f'Análisis de {param.capitalize()}'
-        if 'range_analysis' in param_analysis and 'status' in param_analysis['range_analysis']:
-            status = param_analysis['range_analysis']['status']
-            if status == 'optimal':
-                title += ' - ÓPTIMO'
-            elif status == 'acceptable':
-                title += ' - ACEPTABLE'
-            elif status == 'suboptimal':
-                title += ' - SUBÓPTIMO'
-        
-        plt.title(title)
-        
-        # Añadir leyenda
-        plt.legend()
-        
-        # Añadir cuadrícula
-        plt.grid(True, linestyle='--', alpha=0.7)
-        
-        # Formatear eje x para mejor visualización de fechas
-        plt.gcf().autofmt_xdate()
-        
-        # Añadir estadísticas como texto
-        if 'statistics' in param_analysis:
-            stats = param_analysis['statistics']
-            stats_text = f"Media: {stats['mean']:.2f} {unit}\n"
-            stats_text += f"Mín: {stats['min']:.2f} {unit}\n"
-            stats_text += f"Máx: {stats['max']:.2f} {unit}"
-            
-            plt.figtext(0.02, 0.02, stats_text, fontsize=9,
-                      bbox=dict(facecolor='white', alpha=0.8))
-        
-        # Añadir información de rango óptimo
-        if 'range_analysis' in param_analysis and 'pct_in_range' in param_analysis['range_analysis']:
-            range_data = param_analysis['range_analysis']
-            range_text = f"Tiempo en rango óptimo: {range_data['pct_in_range']:.1f}%\n"
-            range_text += f"Por debajo: {range_data['pct_below_range']:.1f}%\n"
-            range_text += f"Por encima: {range_data['pct_above_range']:.1f}%"
-            
-            plt.figtext(0.98, 0.02, range_text, fontsize=9,
-                      bbox=dict(facecolor='white', alpha=0.8),
-                      horizontalalignment='right')
-        
-        # Guardar imagen
         timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
         filename = f"{param.lower().replace(' ', '_')}_analysis_{timestamp}.png"
         filepath = os.path.join(self.output_dir, filename)
         
-        plt.tight_layout()
-        plt.savefig(filepath, dpi=100)
-        plt.close()
-        
-        return filepath
+        # Separación media entre índices: (último - primero) / (n - 1), sin np.diff
+        n = len(df)
+        index_step = (df.index[-1] - df.index[0]) / (n - 1) if n > 1 else 0.0
+        
+        return self._render(
+            _render_parameter_plot,
+            df['timestamp'].to_numpy(),
+            df['value'].to_numpy(),
+            index_step,
+            param, param_analysis, unit, filepath
+        )
     
     def _visualize_overall_analysis(self, analysis):
         """
@@ -598,163 +924,429 @@ class GrowthAnalyzer:
             analysis: Diccionario con resultados de análisis
             
         Returns:
-            Ruta al archivo de imagen guardado
-        """
-        # Crear figura con 2x2 subplots
-        fig, ((ax1, ax2), (ax3, ax4)) = plt.subplots(2, 2, figsize=(15, 12))
-        
-        # 1. Gráfico de puntuación general (gauge)
-        overall_analysis = analysis.get('overall_analysis', {})
-        overall_score = overall_analysis.get('overall_score', 0)
-        category = overall_analysis.get('category', 'unknown')
-        
-        gauge_colors = {
-            'poor': 'red',
-            'fair': 'orange',
-            'good': 'lightgreen',
-            'excellent': 'green',
-            'unknown': 'gray'
-        }
+            Future con la ruta al archivo de imagen guardado
+        """
+        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+        filename = f"overall_analysis_{timestamp}.png"
+        filepath = os.path.join(self.output_dir, filename)
         
-        gauge_color = gauge_colors.get(category, 'gray')
-        ax1.pie([overall_score, 100-overall_score], colors=[gauge_color, 'lightgray'], 
-               startangle=90, counterclock=False,
-               wedgeprops={'width': 0.3, 'edgecolor': 'w'})
+        # Solo se envían al proceso de renderizado las partes que usa el gráfico
+        plot_data = {
+            'overall_analysis': analysis.get('overall_analysis', {}),
+            'parameter_analysis': analysis.get('parameter_analysis', {})
+        }
+        return self._render(_render_overall_plot, plot_data, filepath)
+    
+    def _render(self, func, *args):
+        """
+        Ejecuta una función de renderizado en el pool de procesos, o en el
+        proceso actual si el pool está deshabilitado.
         
-        ax1.text(0, 0, f"{overall_score:.1f}", ha='center', va='center', fontsize=36)
-        ax1.text(0, -0.2, f"{category.upper()}", ha='center', va='center', fontsize=14)
+        Args:
+            func: Función de renderizado (a nivel de módulo, serializable)
+            *args: Argumentos de la función
+            
+        Returns:
+            Future con el resultado de la función
+        """
+        pool = self._get_render_pool()
+        if pool is not None:
+            try:
+                return pool.submit(func, *args)
+            except BrokenProcessPool:
+                # Un proceso del pool terminó de forma inesperada: se descarta
+                # el pool y se envía el trabajo a uno nuevo
+                self._discard_render_pool(pool)
+                return self._get_render_pool().submit(func, *args)
+        
+        future = Future()
+        try:
+            with _RENDER_LOCK:
+                future.set_result(func(*args))
+        except Exception as e:
+            future.set_exception(e)
+        return future
+    
+    def _get_render_pool(self):
+        """
+        Crea (la primera vez) el pool de procesos para renderizar gráficos.
         
-        # Añadir título
-        ax1.set_title('Puntuación de Crecimiento')
-        ax1.axis('equal')
+        No se usa pool si 'render_workers' es 0 (valor por defecto) o si el
+        analizador ya se ejecuta dentro de un proceso secundario (evita crear
+        pools anidados, p. ej. al analizar varios perfiles en paralelo).
         
-        # 2. Gráfico de parámetros
-        param_analysis = analysis.get('parameter_analysis', {})
-        params = []
-        values = []
-        colors = []
+        Returns:
+            ProcessPoolExecutor o None para renderizar en el proceso actual
+        """
+        with self._render_pool_lock:
+            if self._render_pool is None and self.render_workers != 0:
+                if multiprocessing.current_process().name != 'MainProcess':
+                    self.render_workers = 0
+                    return None
+                self._render_pool = ProcessPoolExecutor(max_workers=self.render_workers,
+                                                        mp_context=_RENDER_MP_CONTEXT)
+            return self._render_pool
+    
+    def _discard_render_pool(self, pool=None):
+        """
+        Descarta el pool de renderizado roto para que se cree otro al próximo uso.
         
-        for param, param_data in param_analysis.items():
-            if 'range_analysis' in param_data and 'pct_in_range' in param_data['range_analysis']:
-                params.append(param.capitalize())
-                
-                # Calcular porcentaje en rango óptimo
-                pct = param_data['range_analysis']['pct_in_range']
-                values.append(pct)
-                
-                # Determinar color basado en estado
-                status = param_data['range_analysis'].get('status', 'unknown')
-                if status == 'optimal':
-                    colors.append('green')
-                elif status == 'acceptable':
-                    colors.append('lightgreen')
-                elif status == 'suboptimal':
-                    colors.append('red')
-                else:
-                    colors.append('gray')
+        Args:
+            pool: Pool que ha fallado (por defecto, el pool actual). Si otro hilo
+                ya lo ha sustituido, no se hace nada.
+        """
+        with self._render_pool_lock:
+            if self._render_pool is None or (pool is not None and pool is not self._render_pool):
+                return
+            pool, self._render_pool = self._render_pool, None
+        pool.shutdown(wait=False)
+
+
+def _render_parameter_plot(timestamps, values, index_step, param, param_analysis, unit, filepath):
+    """
+    Dibuja y guarda el gráfico de un parámetro. Recibe arrays simples (no
+    DataFrames) para poder ejecutarse en un proceso de renderizado.
+    
+    Args:
+        timestamps: Array datetime64 con las marcas de tiempo
+        values: Array con los valores del sensor
+        index_step: Separación media entre índices (segundos) para la línea de tendencia
+        param: Nombre del parámetro
+        param_analysis: Análisis del parámetro
+        unit: Unidad del parámetro
+        filepath: Ruta del archivo de imagen
+        
+    Returns:
+        Ruta al archivo de imagen guardado
+    """
+    # Crear figura (con lienzo Agg, sin pyplot)
+    fig = Figure(figsize=(12, 6))
+    FigureCanvasAgg(fig)
+    ax = fig.add_subplot()
+    
+    # Gráfico principal de datos
+    ax.plot(timestamps, values, 'b-', linewidth=1.5)
+    
+    # Añadir rango óptimo si está disponible
+    if 'range_analysis' in param_analysis and 'optimal_min' in param_analysis['range_analysis']:
+        min_val = param_analysis['range_analysis']['optimal_min']
+        max_val = param_analysis['range_analysis']['optimal_max']
+        
+        ax.axhspan(min_val, max_val, alpha=0.2, color='green', label='Rango óptimo')
+        ax.axhline(y=min_val, color='g', linestyle='--', alpha=0.7)
+        ax.axhline(y=max_val, color='g', linestyle='--', alpha=0.7)
+    
+    # Añadir tendencia si está disponible
+    if 'trend_analysis' in param_analysis and 'slope' in param_analysis['trend_analysis']:
+        # Calcular línea de tendencia: al ser una recta basta con sus extremos
+        # (índices 0 y n-1), sin arrays del tamaño de los datos
+        x = np.array([0, len(values) - 1])
+        slope = param_analysis['trend_analysis']['slope']
+        intercept = values[0]
+        trend_line = intercept + slope * x
+        
+        # Convertir índices a timestamps para graficar (aritmética int64 en nanosegundos)
+        start_ns = pd.Timestamp(timestamps[0]).value
+        step_ns = int(round(index_step * 1e9))
+        trend_timestamps = (start_ns + step_ns * x).view('datetime64[ns]')
+        
+        ax.plot(trend_timestamps, trend_line, 'r--', linewidth=1.5, label='Tendencia')
+    
+    # Configurar etiquetas y título
+    ax.set_xlabel('Fecha/Hora')
+    ax.set_ylabel(f'{param.capitalize()} ({unit})' if unit else param.capitalize())
+    
+    # Determinar título basado en estado
+    title = f'Análisis de {param.capitalize()}'
+    if 'range_analysis' in param_analysis and 'status' in param_analysis['range_analysis']:
+        status_title = _STATUS_TITLES[_status_code(param_analysis['range_analysis'])]
+        if status_title:
+            title += f' - {status_title}'
+    
+    ax.set_title(title)
+    
+    # Añadir leyenda
+    ax.legend()
+    
+    # Añadir cuadrícula
+    ax.grid(True, linestyle='--', alpha=0.7)
+    
+    # Formatear eje x para mejor visualización de fechas
+    fig.autofmt_xdate()
+    
+    # Añadir estadísticas como texto
+    if 'statistics' in param_analysis:
+        stats = param_analysis['statistics']
+        stats_text = f"Media: {stats['mean']:.2f} {unit}\n"
+        stats_text += f"Mín: {stats['min']:.2f} {unit}\n"
+        stats_text += f"Máx: {stats['max']:.2f} {unit}"
+        
+        fig.text(0.02, 0.02, stats_text, fontsize=9,
+                 bbox=dict(facecolor='white', alpha=0.8))
+    
+    # Añadir información de rango óptimo
+    if 'range_analysis' in param_analysis and 'pct_in_range' in param_analysis['range_analysis']:
+        range_data = param_analysis['range_analysis']
+        range_text = f"Tiempo en rango óptimo: {range_data['pct_in_range']:.1f}%\n"
+        range_text += f"Por debajo: {range_data['pct_below_range']:.1f}%\n"
+        range_text += f"Por encima: {range_data['pct_above_range']:.1f}%"
+        
+        fig.text(0.98, 0.02, range_text, fontsize=9,
+                 bbox=dict(facecolor='white', alpha=0.8),
+                 horizontalalignment='right')
+    
+    # Guardar imagen
+    fig.tight_layout()
+    fig.savefig(filepath, dpi=100)
+    
+    return filepath
+
+def _render_overall_plot(analysis, filepath):
+    """
+    Dibuja y guarda el gráfico del análisis general.
+    
+    Args:
+        analysis: Diccionario con 'overall_analysis' y 'parameter_analysis'
+        filepath: Ruta del archivo de imagen
         
-        # Crear gráfico de barras horizontales
-        if params:
-            bars = ax2.barh(params, values, color=colors)
-            
-            # Añadir etiquetas de porcentaje
-            for bar in bars:
-                width = bar.get_width()
-                ax2.text(width + 1, bar.get_y() + bar.get_height()/2, 
-                        f'{width:.1f}%', ha='left', va='center')
+    Returns:
+        Ruta al archivo de imagen guardado
+    """
+    # Crear figura con 2x2 subplots (con lienzo Agg, sin pyplot)
+    fig = Figure(figsize=(15, 12))
+    FigureCanvasAgg(fig)
+    ((ax1, ax2), (ax3, ax4)) = fig.subplots(2, 2)
+    
+    # 1. Gráfico de puntuación general (gauge)
+    overall_analysis = analysis.get('overall_analysis', {})
+    overall_score = overall_analysis.get('overall_score', 0)
+    category = overall_analysis.get('category', 'unknown')
+    
+    gauge_colors = {
+        'poor': 'red',
+        'fair': 'orange',
+        'good': 'lightgreen',
+        'excellent': 'green',
+        'unknown': 'gray'
+    }
+    
+    gauge_color = gauge_colors.get(category, 'gray')
+    ax1.pie([overall_score, 100-overall_score], colors=[gauge_color, 'lightgray'], 
+           startangle=90, counterclock=False,
+           wedgeprops={'width': 0.3, 'edgecolor': 'w'})
+    
+    ax1.text(0, 0, f"{overall_score:.1f}", ha='center', va='center', fontsize=36)
+    ax1.text(0, -0.2, f"{category.upper()}", ha='center', va='center', fontsize=14)
+    
+    # Añadir título
+    ax1.set_title('Puntuación de Crecimiento')
+    ax1.axis('equal')
+    
+    # 2. Gráfico de parámetros
+    param_analysis = analysis.get('parameter_analysis', {})
+    params = []
+    values = []
+    colors = []
+    
+    for param, param_data in param_analysis.items():
+        if 'range_analysis' in param_data and 'pct_in_range' in param_data['range_analysis']:
+            params.append(param.capitalize())
             
-            # Configurar etiquetas y título
-            ax2.set_xlabel('% en Rango Óptimo')
-            ax2.set_title('Parámetros de Crecimiento')
+            # Calcular porcentaje en rango óptimo
+            pct = param_data['range_analysis']['pct_in_range']
+            values.append(pct)
             
-            # Establecer límites del eje x
-            ax2.set_xlim(0, 105)
-        else:
-            ax2.text(0.5, 0.5, 'No hay datos de parámetros disponibles', 
-                    ha='center', va='center', fontsize=12)
-            ax2.axis('off')
-        
-        # 3. Gráfico de tendencias
-        trends = {'increasing': [], 'decreasing': [], 'stable': [], 'unknown': []}
-        
-        for param, param_data in param_analysis.items():
-            if 'trend_analysis' in param_data and 'trend' in param_data['trend_analysis']:
-                trend = param_data['trend_analysis']['trend']
-                trends[trend].append(param.capitalize())
-        
-        # Preparar datos para gráfico
-        trend_labels = []
-        trend_counts = []
-        trend_colors = []
-        
-        for trend, params in trends.items():
-            if params:  # Solo incluir tendencias con parámetros
-                if trend == 'increasing':
-                    label = 'Creciente'
-                    color = 'green'
-                elif trend == 'decreasing':
-                    label = 'Decreciente'
-                    color = 'red'
-                elif trend == 'stable':
-                    label = 'Estable'
-                    color = 'blue'
-                else:
-                    label = 'Desconocida'
-                    color = 'gray'
-                
-                trend_labels.append(label)
-                trend_counts.append(len(params))
-                trend_colors.append(color)
-        
-        # Crear gráfico de pastel
-        if trend_counts:
-            ax3.pie(trend_counts, labels=trend_labels, colors=trend_colors, 
-                   autopct='%1.1f%%', startangle=90)
-            ax3.axis('equal')
-            ax3.set_title('Tendencias de Parámetros')
-        else:
-            ax3.text(0.5, 0.5, 'No hay datos de tendencias disponibles', 
-                    ha='center', va='center', fontsize=12)
-            ax3.axis('off')
+            # Determinar color basado en estado
+            colors.append(_STATUS_COLORS[_status_code(param_data['range_analysis'])])
+    
+    # Crear gráfico de barras horizontales
+    if params:
+        bars = ax2.barh(params, values, color=colors)
         
-        # 4. Gráfico de recomendaciones
-        recommendations = overall_analysis.get('recommendations', [])
+        # Añadir etiquetas de porcentaje
+        for bar in bars:
+            width = bar.get_width()
+            ax2.text(width + 1, bar.get_y() + bar.get_height()/2, 
+                    f'{width:.1f}%', ha='left', va='center')
         
-        if recommendations:
-            # Limitar a 5 recomendaciones para el gráfico
-            if len(recommendations) > 5:
-                display_recommendations = recommendations[:4] + ['Otras recomendaciones...']
-            else:
-                display_recommendations = recommendations
-            
-            # Crear texto para mostrar
-            rec_text = '\n\n'.join([f"{i+1}. {rec}" for i, rec in enumerate(display_recommendations)])
-            
-            ax4.text(0.5, 0.5, rec_text, 
-                    ha='center', va='center', fontsize=11,
-                    bbox=dict(facecolor='white', alpha=0.8),
-                    wrap=True)
-            ax4.axis('off')
-            ax4.set_title('Recomendaciones')
+        # Configurar etiquetas y título
+        ax2.set_xlabel('% en Rango Óptimo')
+        ax2.set_title('Parámetros de Crecimiento')
+        
+        # Establecer límites del eje x
+        ax2.set_xlim(0, 105)
+    else:
+        ax2.text(0.5, 0.5, 'No hay datos de parámetros disponibles', 
+                ha='center', va='center', fontsize=12)
+        ax2.axis('off')
+    
+    # 3. Gráfico de tendencias
+    trend_codes = [
+        _TREND_CODES.get(param_data['trend_analysis']['trend'], _TREND_CODES['unknown'])
+        for param_data in param_analysis.values()
+        if 'trend_analysis' in param_data and 'trend' in param_data['trend_analysis']
+    ]
+    counts = np.bincount(trend_codes, minlength=len(_TREND_LABELS))
+    
+    # Preparar datos para gráfico (solo tendencias con parámetros)
+    present = np.flatnonzero(counts)
+    trend_labels = [_TREND_LABELS[code] for code in present]
+    trend_counts = counts[present].tolist()
+    trend_colors = [_TREND_COLORS[code] for code in present]
+    
+    # Crear gráfico de pastel
+    if trend_counts:
+        ax3.pie(trend_counts, labels=trend_labels, colors=trend_colors, 
+               autopct='%1.1f%%', startangle=90)
+        ax3.axis('equal')
+        ax3.set_title('Tendencias de Parámetros')
+    else:
+        ax3.text(0.5, 0.5, 'No hay datos de tendencias disponibles', 
+                ha='center', va='center', fontsize=12)
+        ax3.axis('off')
+    
+    # 4. Gráfico de recomendaciones
+    recommendations = overall_analysis.get('recommendations', [])
+    
+    if recommendations:
+        # Limitar a 5 recomendaciones para el gráfico
+        if len(recommendations) > 5:
+            display_recommendations = recommendations[:4] + ['Otras recomendaciones...']
         else:
-            ax4.text(0.5, 0.5, 'No hay recomendaciones disponibles', 
-                    ha='center', va='center', fontsize=12)
-            ax4.axis('off')
-            ax4.set_title('Recomendaciones')
-        
-        # Añadir título general
-        plt.suptitle('Análisis General de Crecimiento', fontsize=16)
-        
-        # Guardar imagen
-        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-        filename = f"overall_analysis_{timestamp}.png"
-        filepath = os.path.join(self.output_dir, filename)
-        
-        plt.tight_layout(rect=[0, 0, 1, 0.97])  # Ajustar para título general
-        plt.savefig(filepath, dpi=100)
-        plt.close()
-        
-        return filepath
+            display_recommendations = recommendations
+        
+        # Crear texto para mostrar
+        rec_text = '\n\n'.join([f"{i+1}. {rec}" for i, rec in enumerate(display_recommendations)])
+        
+        ax4.text(0.5, 0.5, rec_text, 
+                ha='center', va='center', fontsize=11,
+                bbox=dict(facecolor='white', alpha=0.8),
+                wrap=True)
+        ax4.axis('off')
+        ax4.set_title('Recomendaciones')
+    else:
+        ax4.text(0.5, 0.5, 'No hay recomendaciones disponibles', 
+                ha='center', va='center', fontsize=12)
+        ax4.axis('off')
+        ax4.set_title('Recomendaciones')
+    
+    # Añadir título general
+    fig.suptitle('Análisis General de Crecimiento', fontsize=16)
+    
+    # Guardar imagen
+    fig.tight_layout(rect=[0, 0, 1, 0.97])  # Ajustar para título general
+    fig.savefig(filepath, dpi=100)
+    
+    return filepath
+
+
+# Plantillas del dashboard HTML (str.format). El estilo y la estructura fija de
+# la cabecera no dependen del análisis y se escriben tal cual.
+_DASHBOARD_HEAD_TMPL = """<!DOCTYPE html>
+<html lang='es'>
+<head>
+  <meta charset='UTF-8'>
+  <meta name='viewport' content='width=device-width, initial-scale=1.0'>
+  <title>Dashboard de Análisis - {plant_profile}</title>
+"""
+
+_STATIC_HEAD = """  <style>
+    body { font-family: Arial, sans-serif; line-height: 1.6; margin: 0; padding: 20px; color: #333; }
+    h1, h2, h3 { color: #2c3e50; }
+    .container { max-width: 1200px; margin: 0 auto; }
+    .header { background-color: #3498db; color: white; padding: 20px; border-radius: 5px; }
+    .section { margin: 20px 0; padding: 15px; background-color: #f9f9f9; border-radius: 5px; }
+    .score { font-size: 48px; font-weight: bold; text-align: center; }
+    .excellent { color: #27ae60; }
+    .good { color: #2ecc71; }
+    .fair { color: #f39c12; }
+    .poor { color: #e74c3c; }
+    .chart { max-width: 100%; height: auto; display: block; margin: 20px auto; }
+    .parameter-grid { display: grid; grid-template-columns: repeat(auto-fill, minmax(300px, 1fr)); gap: 20px; }
+    .parameter-card { background-color: #fff; border-radius: 5px; padding: 15px; box-shadow: 0 2px 5px rgba(0,0,0,0.1); }
+    .parameter-value { font-size: 24px; font-weight: bold; margin: 10px 0; }
+    .optimal { color: #27ae60; }
+    .acceptable { color: #2ecc71; }
+    .suboptimal { color: #e74c3c; }
+    .trend-up { color: #27ae60; }
+    .trend-down { color: #e74c3c; }
+    .trend-stable { color: #3498db; }
+    .recommendations { background-color: #fff; border-radius: 5px; padding: 15px; box-shadow: 0 2px 5px rgba(0,0,0,0.1); }
+    .recommendations ul { padding-left: 20px; }
+    .recommendations li { margin-bottom: 10px; }
+  </style>
+</head>
+<body>
+  <div class='container'>
+"""
+
+_DASHBOARD_SUMMARY_TMPL = """    <div class='header'>
+      <h1>Dashboard de Análisis: {plant_profile}</h1>
+      <p>Fecha: {date}</p>
+    </div>
+    <div class='section'>
+      <h2>Evaluación General</h2>
+      <div class='score {category}'>{overall_score:.1f}</div>
+      <p style='text-align: center;'><strong>Categoría:</strong> {category_upper}</p>
+      <p style='text-align: center;'>{message}</p>
+"""
+
+_OVERALL_IMAGE_TMPL = "      <img src='{name}' alt='Análisis general' class='chart'>\n"
+
+_PARAMETERS_HEAD = """    </div>
+    <div class='section'>
+      <h2>Análisis de Parámetros</h2>
+      <div class='parameter-grid'>
+"""
+
+_PARAM_CARD_TMPL = """        <div class='parameter-card'>
+          <h3>{title}</h3>
+          <div class='parameter-value {status}'>{mean_value:.2f}</div>
+{details}        </div>
+"""
+
+_PARAMETERS_TAIL = """      </div>
+    </div>
+"""
+
+_RECOMMENDATIONS_TMPL = """    <div class='section'>
+      <h2>Recomendaciones</h2>
+      <div class='recommendations'>
+        <ul>
+{items}        </ul>
+      </div>
+    </div>
+"""
+
+_DASHBOARD_TAIL = """    <div style='text-align: center; margin-top: 30px; color: #7f8c8d;'>
+      <p>Generado por Mycodo Plant Analyzer</p>
+    </div>
+  </div>
+</body>
+</html>"""
+
+# Texto del estado y clase CSS de la tendencia en las tarjetas de parámetros
+_DASHBOARD_STATUS_TEXT = {'optimal': 'ÓPTIMO', 'acceptable': 'ACEPTABLE', 'suboptimal': 'SUBÓPTIMO'}
+_TREND_CSS_CLASSES = {'increasing': 'trend-up', 'decreasing': 'trend-down', 'stable': 'trend-stable'}
+
+# Hilos para copiar las imágenes junto al dashboard (operaciones de E/S)
+_COPY_WORKERS = 4
+
+def _link_or_copy(task):
+    """
+    Enlaza (o copia si no es posible) una imagen en el directorio del dashboard.
+    
+    Args:
+        task: Tupla (ruta de origen, ruta de destino)
+    """
+    src_path, dest_path = task
+    try:
+        os.link(src_path, dest_path)
+    except FileNotFoundError:
+        return
+    except OSError:
+        # copyfile copia en el kernel (sendfile) y no copia permisos
+        shutil.copyfile(src_path, dest_path)
 
 
 class VisualizationGenerator:
@@ -783,171 +1375,130 @@ class VisualizationGenerator:
         Returns:
             Ruta al archivo HTML generado
         """
+        now = datetime.now()
         if not output_file:
-            timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+            timestamp = now.strftime('%Y%m%d_%H%M%S')
             output_file = os.path.join(
                 self.output_dir,
                 f"dashboard_{timestamp}.html"
             )
         
-        # Crear HTML básico
-        html = []
-        html.append("<!DOCTYPE html>")
-        html.append("<html lang='es'>")
-        html.append("<head>")
-        html.append("  <meta charset='UTF-8'>")
-        html.append("  <meta name='viewport' content='width=device-width, initial-scale=1.0'>")
-        html.append(f"  <title>Dashboard de Análisis - {analysis_results.get('plant_profile', 'Desconocido')}</title>")
-        html.append("  <style>")
-        html.append("    body { font-family: Arial, sans-serif; line-height: 1.6; margin: 0; padding: 20px; color: #333; }")
-        html.append("    h1, h2, h3 { color: #2c3e50; }")
-        html.append("    .container { max-width: 1200px; margin: 0 auto; }")
-        html.append("    .header { background-color: #3498db; color: white; padding: 20px; border-radius: 5px; }")
-        html.append("    .section { margin: 20px 0; padding: 15px; background-color: #f9f9f9; border-radius: 5px; }")
-        html.append("    .score { font-size: 48px; font-weight: bold; text-align: center; }")
-        html.append("    .excellent { color: #27ae60; }")
-        html.append("    .good { color: #2ecc71; }")
-        html.append("    .fair { color: #f39c12; }")
-        html.append("    .poor { color: #e74c3c; }")
-        html.append("    .chart { max-width: 100%; height: auto; display: block; margin: 20px auto; }")
-        html.append("    .parameter-grid { display: grid; grid-template-columns: repeat(auto-fill, minmax(300px, 1fr)); gap: 20px; }")
-        html.append("    .parameter-card { background-color: #fff; border-radius: 5px; padding: 15px; box-shadow: 0 2px 5px rgba(0,0,0,0.1); }")
-        html.append("    .parameter-value { font-size: 24px; font-weight: bold; margin: 10px 0; }")
-        html.append("    .optimal { color: #27ae60; }")
-        html.append("    .acceptable { color: #2ecc71; }")
-        html.append("    .suboptimal { color: #e74c3c; }")
-        html.append("    .trend-up { color: #27ae60; }")
-        html.append("    .trend-down { color: #e74c3c; }")
-        html.append("    .trend-stable { color: #3498db; }")
-        html.append("    .recommendations { background-color: #fff; border-radius: 5px; padding: 15px; box-shadow: 0 2px 5px rgba(0,0,0,0.1); }")
-        html.append("    .recommendations ul { padding-left: 20px; }")
-        html.append("    .recommendations li { margin-bottom: 10px; }")
-        html.append("  </style>")
-        html.append("</head>")
-        html.append("<body>")
-        html.append("  <div class='container'>")
-        
-        # Encabezado
-        html.append("    <div class='header'>")
-        html.append(f"      <h1>Dashboard de Análisis: {analysis_results.get('plant_profile', 'Desconocido')}</h1>")
-        html.append(f"      <p>Fecha: {datetime.fromisoformat(analysis_results.get('timestamp', datetime.now().isoformat())).strftime('%d/%m/%Y %H:%M')}</p>")
-        html.append("    </div>")
-        
         # Evaluación general
-        overall_analysis = analysis_results.get('overall_analysis', {})
-        overall_score = overall_analysis.get('overall_score', 0)
-        category = overall_analysis.get('category', 'fair')
-        
-        html.append("    <div class='section'>")
-        html.append("      <h2>Evaluación General</h2>")
-        html.append(f"      <div class='score {category}'>{overall_score:.1f}</div>")
-        html.append(f"      <p style='text-align: center;'><strong>Categoría:</strong> {category.upper()}</p>")
-        html.append(f"      <p style='text-align: center;'>{overall_analysis.get('message', '')}</p>")
-        
-        # Incluir imagen de análisis general si está disponible
-        if 'visualizations' in analysis_results and 'overall_analysis' in analysis_results['visualizations']:
-            viz_path = analysis_results['visualizations']['overall_analysis']
-            html.append(f"      <img src='{os.path.basename(viz_path)}' alt='Análisis general' class='chart'>")
-        
-        html.append("    </div>")
-        
-        # Parámetros
-        html.append("    <div class='section'>")
-        html.append("      <h2>Análisis de Parámetros</h2>")
-        html.append("      <div class='parameter-grid'>")
-        
-        param_analysis = analysis_results.get('parameter_analysis', {})
-        for param, analysis in param_analysis.items():
-            # Determinar estado
-            status = 'unknown'
-            if 'range_analysis' in analysis and 'status' in analysis['range_analysis']:
-                status = analysis['range_analysis']['status']
+        get_overall = analysis_results.get('overall_analysis', {}).get
+        category = get_overall('category', 'fair')
+        visualizations = analysis_results.get('visualizations') or {}
+        
+        # Los textos del análisis se escapan una sola vez antes de insertarlos en el HTML
+        plant_profile = escape(str(analysis_results.get('plant_profile', 'Desconocido')))
+        
+        # Fecha del análisis: se acepta un datetime o una cadena ISO y solo se
+        # parsea en el segundo caso
+        analysis_date = analysis_results.get('timestamp')
+        if not isinstance(analysis_date, datetime):
+            analysis_date = datetime.fromisoformat(analysis_date) if analysis_date else now
+        
+        head = _DASHBOARD_HEAD_TMPL.format(plant_profile=plant_profile)
+        summary = _DASHBOARD_SUMMARY_TMPL.format_map({
+            'plant_profile': plant_profile,
+            'date': analysis_date.strftime('%d/%m/%Y %H:%M'),
+            'category': escape(category),
+            'category_upper': escape(category.upper()),
+            'overall_score': get_overall('overall_score', 0),
+            'message': escape(str(get_overall('message', '')))
+        })
+        
+        # Escribir el documento por secciones en un archivo con buffer, sin
+        # construir antes el HTML completo en memoria
+        with open(output_file, 'w', buffering=1 << 16) as f:
+            write = f.write
+            write(head)
+            write(_STATIC_HEAD)
+            write(summary)
             
-            # Determinar tendencia
-            trend = 'unknown'
-            if 'trend_analysis' in analysis and 'trend' in analysis['trend_analysis']:
-                trend = analysis['trend_analysis']['trend']
-            
-            # Determinar clase CSS para tendencia
-            trend_class = ''
-            if trend == 'increasing':
-                trend_class = 'trend-up'
-            elif trend == 'decreasing':
-                trend_class = 'trend-down'
-            elif trend == 'stable':
-                trend_class = 'trend-stable'
-            
-            # Obtener valor medio
-            mean_value = 0
-            if 'statistics' in analysis and 'mean' in analysis['statistics']:
-                mean_value = analysis['statistics']['mean']
-            
-            html.append(f"        <div class='parameter-card'>")
-            html.append(f"          <h3>{param.capitalize()}</h3>")
-            html.append(f"          <div class='parameter-value {status}'>{mean_value:.2f}</div>")
-            
-            # Estado
-            if 'range_analysis' in analysis and 'status' in analysis['range_analysis']:
-                status_map = {
-                    'optimal': 'ÓPTIMO',
-                    'acceptable': 'ACEPTABLE',
-                    'suboptimal': 'SUBÓPTIMO'
-                }
-                status_text = status_map.get(status, status.upper())
-                html.append(f"          <p><strong>Estado:</strong> <span class='{status}'>{status_text}</span></p>")
-                
-                if 'pct_in_range' in analysis['range_analysis']:
-                    html.append(f"          <p><strong>Tiempo en rango óptimo:</strong> {analysis['range_analysis']['pct_in_range']:.1f}%</p>")
+            # Incluir imagen de análisis general si está disponible
+            overall_path = visualizations.get('overall_analysis')
+            if overall_path:
+                write(_OVERALL_IMAGE_TMPL.format(name=escape(os.path.basename(overall_path))))
             
-            # Tendencia
-            if 'trend_analysis' in analysis and 'message' in analysis['trend_analysis']:
-                html.append(f"          <p><strong>Tendencia:</strong> <span class='{trend_class}'>{analysis['trend_analysis']['message']}</span></p>")
+            # Parámetros
+            write(_PARAMETERS_HEAD)
+            param_analysis = analysis_results.get('parameter_analysis', {})
+            for param, analysis in param_analysis.items():
+                write(_PARAM_CARD_TMPL.format_map(
+                    self._parameter_card_context(param, analysis, visualizations)
+                ))
+            write(_PARAMETERS_TAIL)
             
-            # Enlace a gráfico detallado
-            if 'visualizations' in analysis_results and f"{param}_analysis" in analysis_results['visualizations']:
-                viz_path = analysis_results['visualizations'][f"{param}_analysis"]
-                html.append(f"          <p><a href='{os.path.basename(viz_path)}' target='_blank'>Ver análisis detallado</a></p>")
+            # Recomendaciones
+            recommendations = get_overall('recommendations')
+            if recommendations:
+                write(_RECOMMENDATIONS_TMPL.format(
+                    items="".join(f"          <li>{escape(str(rec))}</li>\n" for rec in recommendations)
+                ))
             
-            html.append("        </div>")
+            write(_DASHBOARD_TAIL)
         
-        html.append("      </div>")
-        html.append("    </div>")
+        # Copiar imágenes al mismo directorio (enlace duro si es posible, sin
+        # copiar bytes; nada si ya están en él)
+        dest_dir = os.path.dirname(output_file)
+        tasks = []
+        for viz_path in visualizations.values():
+            if not viz_path:
+                continue
+            src_dir, name = os.path.split(viz_path)
+            if src_dir != dest_dir:
+                tasks.append((viz_path, os.path.join(dest_dir, name)))
         
-        # Recomendaciones
-        recommendations = overall_analysis.get('recommendations', [])
-        if recommendations:
-            html.append("    <div class='section'>")
-            html.append("      <h2>Recomendaciones</h2>")
-            html.append("      <div class='recommendations'>")
-            html.append("        <ul>")
-            
-            for rec in recommendations:
-                html.append(f"          <li>{rec}</li>")
-            
-            html.append("        </ul>")
-            html.append("      </div>")
-            html.append("    </div>")
+        # Cada copia es independiente: se reparten entre varios hilos
+        if len(tasks) > 1:
+            with ThreadPoolExecutor(max_workers=min(_COPY_WORKERS, len(tasks))) as executor:
+                list(executor.map(_link_or_copy, tasks))
+        elif tasks:
+            _link_or_copy(tasks[0])
         
-        # Pie de página
-        html.append("    <div style='text-align: center; margin-top: 30px; color: #7f8c8d;'>")
-        html.append("      <p>Generado por Mycodo Plant Analyzer</p>")
-        html.append("    </div>")
+        return output_file
+    
+    def _parameter_card_context(self, param, analysis, visualizations):
+        """
+        Prepara los valores de la tarjeta de un parámetro en el dashboard.
         
-        html.append("  </div>")
-        html.append("</body>")
-        html.append("</html>")
+        Args:
+            param: Nombre del parámetro
+            analysis: Análisis del parámetro
+            visualizations: Diccionario con las rutas de las visualizaciones
+            
+        Returns:
+            Diccionario con los valores para _PARAM_CARD_TMPL
+        """
+        range_analysis = analysis.get('range_analysis', {})
+        trend_analysis = analysis.get('trend_analysis', {})
+        
+        # Determinar estado (escapado) y clase CSS para la tendencia
+        raw_status = range_analysis.get('status', 'unknown')
+        status = escape(str(raw_status))
+        trend_class = _TREND_CSS_CLASSES.get(trend_analysis.get('trend', 'unknown'), '')
+        
+        # Líneas opcionales de la tarjeta
+        details = []
+        if 'status' in range_analysis:
+            status_text = _DASHBOARD_STATUS_TEXT.get(raw_status) or escape(str(raw_status).upper())
+            details.append(f"          <p><strong>Estado:</strong> <span class='{status}'>{status_text}</span></p>\n")
+            
+            if 'pct_in_range' in range_analysis:
+                details.append(f"          <p><strong>Tiempo en rango óptimo:</strong> {range_analysis['pct_in_range']:.1f}%</p>\n")
         
-        # Guardar archivo HTML
-        with open(output_file, 'w') as f:
-            f.write("\n".join(html))
+        if 'message' in trend_analysis:
+            details.append(f"          <p><strong>Tendencia:</strong> <span class='{trend_class}'>{escape(str(trend_analysis['message']))}</span></p>\n")
         
-        # Copiar imágenes al mismo directorio
-        visualizations = analysis_results.get('visualizations', {})
-        for viz_path in visualizations.values():
-            if viz_path and os.path.exists(viz_path):
-                dest_path = os.path.join(os.path.dirname(output_file), os.path.basename(viz_path))
-                if viz_path != dest_path:
-                    import shutil
-                    shutil.copy(viz_path, dest_path)
+        # Enlace a gráfico detallado (una sola búsqueda en el diccionario)
+        viz_path = visualizations.get(param + '_analysis')
+        if viz_path:
+            details.append(f"          <p><a href='{escape(os.path.basename(viz_path))}' target='_blank'>Ver análisis detallado</a></p>\n")
         
-        return output_file
+        return {
+            'title': escape(str(param).capitalize()),
+            'status': status,
+            'mean_value': analysis.get('statistics', {}).get('mean', 0),
+            'details': "".join(details)
+        }
+
@@ -3,10 +3,93 @@ Módulo principal para la conexión con Mycodo.
 """
 import os
 import json
-import requests
+import time
+import hashlib
+import threading
+import numpy as np
 import pandas as pd
 from datetime import datetime, timedelta
-from influxdb import InfluxDBClient
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Tiempo máximo de espera (en segundos) de las solicitudes a la API de Mycodo
+_API_TIMEOUT = 30
+
+# Máximo de sensores consultados en paralelo
+_MAX_FETCH_WORKERS = 8
+
+# Número de puntos por bloque en las consultas a InfluxDB
+_INFLUXDB_CHUNK_SIZE = 10000
+
+# Columnas que se leen de los archivos CSV exportados
+_EXPORT_COLUMNS = frozenset(['timestamp', 'value', 'input_id', 'measurement'])
+
+# Ventana (en segundos) durante la cual se reutilizan las mediciones ya
+# obtenidas para el mismo sensor y número de días. Pasada la ventana la clave
+# cambia, así que las entradas más antiguas se descartan (en memoria y en disco).
+_CACHE_WINDOW = 600
+
+# Máximo de consultas guardadas en la caché en memoria
+_CACHE_SIZE = 64
+
+# Desde pandas 2.0 el formato se infiere del primer valor; 'ISO8601' acepta
+# marcas de tiempo ISO con distinta precisión (p. ej. con y sin fracciones de
+# segundo, como las devuelve InfluxDB). pandas 1.x ya las acepta por defecto.
+_ISO8601_KWARGS = {'format': 'ISO8601'} if int(pd.__version__.split('.')[0]) >= 2 else {}
+
+def _response_json(response):
+    """
+    Decodifica el cuerpo JSON de una respuesta HTTP, con orjson si está
+    disponible (bastante más rápido con listas grandes de mediciones).
+    
+    Args:
+        response: Respuesta de requests
+        
+    Returns:
+        Objeto Python decodificado
+    """
+    if orjson is not None:
+        return orjson.loads(response.content)
+    return response.json()
+
+def _measurements_frame(items, input_id):
+    """
+    Convierte una lista de mediciones (diccionarios con 'time', 'value' y
+    opcionalmente 'input_id' y 'measurement') en un DataFrame, con operaciones
+    vectorizadas en lugar de un bucle por muestra.
+    
+    Args:
+        items: Lista de diccionarios con las mediciones
+        input_id: ID del sensor para las mediciones que no lo incluyen
+        
+    Returns:
+        DataFrame con columnas timestamp, value, input_id y measurement
+    """
+    if not items:
+        return pd.DataFrame()
+    
+    raw = pd.DataFrame(items)
+    df = pd.DataFrame({
+        'timestamp': pd.to_datetime(raw['time'], cache=True, **_ISO8601_KWARGS),
+        'value': pd.to_numeric(raw['value'], downcast='float')
+    })
+    
+    if 'input_id' in raw.columns:
+        df['input_id'] = raw['input_id'].fillna(input_id) if input_id is not None else raw['input_id']
+    else:
+        df['input_id'] = input_id
+    
+    if 'measurement' in raw.columns:
+        df['measurement'] = raw['measurement'].fillna('unknown')
+    else:
+        df['measurement'] = 'unknown'
+    
+    return df
 
 class MycodoConnector:
     """
@@ -33,6 +116,15 @@ class MycodoConnector:
         self.mycodo_config = self.config.get('mycodo', {})
         self.connection_method = self.mycodo_config.get('connection_method', 'api')
         
+        # Caché de mediciones en memoria y, si se configura 'cache_dir', en disco
+        # (compartida entre ejecuciones). La clave incluye la configuración de
+        # conexión para no mezclar datos de distintas instalaciones.
+        self._cache = OrderedDict()
+        self._cache_lock = threading.Lock()
+        cache_dir = self.mycodo_config.get('cache_dir')
+        self._cache_dir = os.path.expanduser(cache_dir) if cache_dir else None
+        self._cache_source = json.dumps(self.mycodo_config, sort_keys=True, default=str)
+        
         # Inicializar conexión según el método seleccionado
         if self.connection_method == 'api':
             self._init_api_connection()
@@ -45,15 +137,29 @@ class MycodoConnector:
     
     def _init_api_connection(self):
         """Inicializa la conexión a la API REST de Mycodo"""
+        # Importación diferida: solo hace falta con la API
+        import requests
+        from requests.adapters import HTTPAdapter
+        
         self.api_url = f"http{'s' if self.mycodo_config.get('ssl', False) else ''}://{self.mycodo_config.get('host', 'localhost')}:{self.mycodo_config.get('port', 8080)}/api"
         self.api_key = self.mycodo_config.get('api_key', '')
         self.headers = {
             'X-API-KEY': self.api_key,
             'Content-Type': 'application/json'
         }
+        
+        # Sesión persistente: reutiliza las conexiones TCP/TLS entre solicitudes
+        self._session = requests.Session()
+        self._session.headers.update(self.headers)
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=8, max_retries=3)
+        self._session.mount('http://', adapter)
+        self._session.mount('https://', adapter)
     
     def _init_influxdb_connection(self):
         """Inicializa la conexión directa a InfluxDB"""
+        # Importación diferida: solo hace falta con InfluxDB
+        from influxdb import InfluxDBClient
+        
         influxdb_config = self.mycodo_config.get('influxdb', {})
         self.influxdb_client = InfluxDBClient(
             host=influxdb_config.get('host', 'localhost'),
@@ -88,9 +194,9 @@ class MycodoConnector:
             Lista de dispositivos de entrada
         """
         if self.connection_method == 'api':
-            response = requests.get(f"{self.api_url}/inputs", headers=self.headers)
+            response = self._session.get(f"{self.api_url}/inputs", timeout=_API_TIMEOUT)
             if response.status_code == 200:
-                return response.json()
+                return _response_json(response)
             else:
                 print(f"Error al obtener dispositivos de entrada: {response.status_code}")
                 return []
@@ -102,32 +208,160 @@ class MycodoConnector:
             print("Método de conexión no soporta esta operación")
             return []
     
-    def get_measurements(self, input_id=None, days=30):
+    def get_measurements(self, input_id=None, days=30, end_time=None):
         """
         Obtiene mediciones de un sensor específico o de todos los sensores.
         
         Args:
             input_id: ID del sensor (opcional)
             days: Número de días de datos históricos a obtener
+            end_time: Fin del intervalo a obtener (por defecto: ahora)
+            
+        Returns:
+            DataFrame con las mediciones
+        """
+        if end_time is None:
+            end_time = datetime.now()
+        
+        # Las consultas repetidas dentro de la misma ventana no vuelven a
+        # descargar los datos; se devuelve una copia para que el llamador
+        # pueda modificarla sin alterar la caché
+        key = f"{input_id}|{days}|{int(end_time.timestamp()) // _CACHE_WINDOW}"
+        df = self._cache_get(key)
+        if df is None:
+            df = self._fetch_measurements(input_id, days, end_time)
+            if not df.empty:
+                self._cache_put(key, df)
+        
+        return df.copy()
+    
+    def _cache_path(self, key):
+        """
+        Devuelve la ruta del archivo de caché en disco para una consulta.
+        
+        Args:
+            key: Clave de la consulta
+            
+        Returns:
+            Ruta del archivo, o None si la caché en disco no está activada
+        """
+        if not self._cache_dir:
+            return None
+        digest = hashlib.blake2b(f"{self._cache_source}|{key}".encode(), digest_size=16).hexdigest()
+        return os.path.join(self._cache_dir, f"{digest}.pkl")
+    
+    def _cache_get(self, key):
+        """
+        Busca en la caché las mediciones de una consulta.
+        
+        Args:
+            key: Clave de la consulta
+            
+        Returns:
+            DataFrame guardado, o None si no está en la caché
+        """
+        with self._cache_lock:
+            entry = self._cache.get(key)
+            if entry is not None:
+                if time.monotonic() - entry[0] <= _CACHE_WINDOW:
+                    self._cache.move_to_end(key)
+                    return entry[1]
+                del self._cache[key]
+        
+        path = self._cache_path(key)
+        if path and os.path.exists(path):
+            try:
+                df = pd.read_pickle(path)
+            except Exception as e:
+                print(f"Error al leer la caché {path}: {e}")
+                return None
+            self._cache_store(key, df)
+            return df
+        
+        return None
+    
+    def _cache_store(self, key, df):
+        """
+        Guarda un DataFrame en la caché en memoria, descartando las entradas
+        caducadas y, si se supera _CACHE_SIZE, las usadas hace más tiempo.
+        
+        Args:
+            key: Clave de la consulta
+            df: DataFrame con las mediciones
+        """
+        now = time.monotonic()
+        with self._cache_lock:
+            expired = [k for k, (created, _) in self._cache.items() if now - created > _CACHE_WINDOW]
+            for k in expired:
+                del self._cache[k]
+            self._cache[key] = (now, df)
+            if len(self._cache) > _CACHE_SIZE:
+                self._cache.popitem(last=False)
+    
+    def _prune_cache_dir(self):
+        """Elimina del directorio de caché los archivos de ventanas ya pasadas."""
+        cutoff = time.time() - _CACHE_WINDOW
+        try:
+            with os.scandir(self._cache_dir) as entries:
+                for entry in entries:
+                    try:
+                        if entry.name.endswith(('.pkl', '.tmp')) and entry.stat().st_mtime < cutoff:
+                            os.remove(entry.path)
+                    except FileNotFoundError:
+                        # Otra ejecución ya lo ha eliminado
+                        continue
+        except OSError as e:
+            print(f"Error al limpiar la caché {self._cache_dir}: {e}")
+    
+    def _cache_put(self, key, df):
+        """
+        Guarda en la caché las mediciones de una consulta.
+        
+        Args:
+            key: Clave de la consulta
+            df: DataFrame con las mediciones
+        """
+        self._cache_store(key, df)
+        
+        path = self._cache_path(key)
+        if path:
+            # Escritura atómica: otra ejecución nunca ve un archivo a medias
+            tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            try:
+                os.makedirs(self._cache_dir, exist_ok=True)
+                df.to_pickle(tmp_path)
+                os.replace(tmp_path, path)
+            except Exception as e:
+                print(f"Error al guardar la caché {path}: {e}")
+                return
+            self._prune_cache_dir()
+    
+    def _fetch_measurements(self, input_id, days, end_time):
+        """
+        Obtiene las mediciones con el método de conexión configurado.
+        
+        Args:
+            input_id: ID del sensor (opcional)
+            days: Número de días de datos históricos a obtener
+            end_time: Fin del intervalo a obtener
             
         Returns:
             DataFrame con las mediciones
         """
         if self.connection_method == 'api':
-            return self._get_measurements_api(input_id, days)
+            return self._get_measurements_api(input_id, days, end_time)
         elif self.connection_method == 'influxdb':
-            return self._get_measurements_influxdb(input_id, days)
+            return self._get_measurements_influxdb(input_id, days, end_time)
         elif self.connection_method == 'export':
-            return self._get_measurements_export(input_id, days)
+            return self._get_measurements_export(input_id, days, end_time)
         elif self.connection_method == 'daemon':
-            return self._get_measurements_daemon(input_id, days)
+            return self._get_measurements_daemon(input_id, days, end_time)
         else:
             print("Método de conexión no reconocido")
             return pd.DataFrame()
     
-    def _get_measurements_api(self, input_id, days):
+    def _get_measurements_api(self, input_id, days, end_time):
         """Obtiene mediciones usando la API REST"""
-        end_time = datetime.now()
         start_time = end_time - timedelta(days=days)
         
         # Formatear fechas para la API
@@ -146,105 +380,102 @@ class MycodoConnector:
         }
         
         # Realizar solicitud
-        response = requests.get(url, headers=self.headers, params=params)
+        response = self._session.get(url, params=params, timeout=_API_TIMEOUT)
         
         if response.status_code == 200:
-            data = response.json()
+            data = _response_json(response)
             
             # Convertir a DataFrame
-            measurements = []
-            for item in data:
-                measurements.append({
-                    'timestamp': datetime.fromisoformat(item['time']),
-                    'value': float(item['value']),
-                    'input_id': item.get('input_id', input_id),
-                    'measurement': item.get('measurement', 'unknown')
-                })
-            
-            return pd.DataFrame(measurements)
+            return _measurements_frame(data, input_id)
         else:
             print(f"Error al obtener mediciones: {response.status_code}")
             return pd.DataFrame()
     
-    def _get_measurements_influxdb(self, input_id, days):
+    def _get_measurements_influxdb(self, input_id, days, end_time):
         """Obtiene mediciones directamente de InfluxDB"""
-        end_time = datetime.now()
         start_time = end_time - timedelta(days=days)
         
         # Formatear fechas para InfluxDB
         start_str = start_time.strftime('%Y-%m-%dT%H:%M:%SZ')
         end_str = end_time.strftime('%Y-%m-%dT%H:%M:%SZ')
         
-        # Construir consulta
-        query = f'SELECT * FROM "measurements" WHERE time >= \'{start_str}\' AND time <= \'{end_str}\''
+        # Construir consulta con parámetros enlazados (sin interpolar valores en
+        # el texto) y solo con las columnas que se usan
+        query = 'SELECT "value", "input_id", "measurement" FROM "measurements" WHERE time >= $start AND time <= $end'
+        bind_params = {'start': start_str, 'end': end_str}
         if input_id:
-            query += f' AND "input_id" = \'{input_id}\''
+            query += ' AND "input_id" = $input_id'
+            bind_params['input_id'] = input_id
         
-        # Ejecutar consulta
-        result = self.influxdb_client.query(query)
+        # Ejecutar consulta; la respuesta se decodifica por bloques
+        result = self.influxdb_client.query(query, bind_params=bind_params,
+                                            chunked=True, chunk_size=_INFLUXDB_CHUNK_SIZE)
         
         # Convertir a DataFrame
-        if result:
-            points = list(result.get_points())
+        points = [point for chunk in result for point in chunk.get_points()]
+        if points:
             df = pd.DataFrame(points)
             
             # Convertir columna de tiempo a datetime
             if 'time' in df.columns:
-                df['timestamp'] = pd.to_datetime(df['time'])
+                df['timestamp'] = pd.to_datetime(df['time'], cache=True, **_ISO8601_KWARGS)
                 df.drop('time', axis=1, inplace=True)
             
             return df
         else:
             return pd.DataFrame()
     
-    def _get_measurements_export(self, input_id, days):
+    def _get_measurements_export(self, input_id, days, end_time):
         """Obtiene mediciones de archivos exportados"""
-        # Buscar archivos CSV en el directorio de exportación
-        csv_files = []
-        for file in os.listdir(self.export_dir):
-            if file.endswith('.csv'):
-                file_path = os.path.join(self.export_dir, file)
-                # Verificar si el archivo es reciente (dentro del rango de días)
-                file_time = datetime.fromtimestamp(os.path.getmtime(file_path))
-                if (datetime.now() - file_time).days <= days:
-                    csv_files.append(file_path)
-        
-        # Leer y combinar archivos CSV
+        start_time = end_time - timedelta(days=days)
+        
+        # Límites del intervalo para comparar directamente con arrays datetime64
+        lower = np.datetime64(start_time)
+        upper = np.datetime64(end_time)
+        
+        # Buscar archivos CSV recientes en el directorio de exportación (menos de
+        # days + 1 días completos de antigüedad); scandir obtiene nombre y fecha
+        # de modificación sin una llamada al sistema adicional por archivo
+        cutoff = (start_time - timedelta(days=1)).timestamp()
+        with os.scandir(self.export_dir) as entries:
+            csv_files = [
+                entry.path for entry in entries
+                if entry.name.endswith('.csv') and entry.is_file() and entry.stat().st_mtime > cutoff
+            ]
+        
+        # Leer solo las columnas útiles de cada CSV y filtrar por sensor y fecha
+        # al leer, para combinar únicamente las filas necesarias
         dfs = []
         for file in csv_files:
             try:
-                df = pd.read_csv(file)
-                # Verificar si el archivo contiene datos del sensor solicitado
-                if input_id and 'input_id' in df.columns and not df[df['input_id'] == input_id].empty:
+                df = pd.read_csv(file, usecols=lambda col: col in _EXPORT_COLUMNS,
+                                 dtype={'value': 'float32'})
+                # Filtrar por el sensor solicitado (si el archivo lo indica)
+                if input_id and 'input_id' in df.columns:
                     df = df[df['input_id'] == input_id]
+                
+                # Convertir columna de tiempo a datetime y filtrar por fecha
+                if 'timestamp' in df.columns:
+                    timestamps = pd.to_datetime(df['timestamp'], cache=True)
+                    ts = timestamps.to_numpy()
+                    in_range = ts >= lower
+                    in_range &= ts <= upper
+                    df = df.assign(timestamp=timestamps)[in_range]
                 dfs.append(df)
             except Exception as e:
                 print(f"Error al leer archivo {file}: {e}")
         
         # Combinar DataFrames
         if dfs:
-            combined_df = pd.concat(dfs, ignore_index=True)
-            
-            # Convertir columna de tiempo a datetime
-            if 'timestamp' in combined_df.columns:
-                combined_df['timestamp'] = pd.to_datetime(combined_df['timestamp'])
-            
-            # Filtrar por fecha
-            end_time = datetime.now()
-            start_time = end_time - timedelta(days=days)
-            combined_df = combined_df[(combined_df['timestamp'] >= start_time) & 
-                                     (combined_df['timestamp'] <= end_time)]
-            
-            return combined_df
+            return pd.concat(dfs, ignore_index=True)
         else:
             return pd.DataFrame()
     
-    def _get_measurements_daemon(self, input_id, days):
+    def _get_measurements_daemon(self, input_id, days, end_time):
         """Obtiene mediciones usando DaemonControl"""
         if not self.daemon_control:
             return pd.DataFrame()
         
-        end_time = datetime.now()
         start_time = end_time - timedelta(days=days)
         
         try:
@@ -256,16 +487,7 @@ class MycodoConnector:
             )
             
             # Convertir a DataFrame
-            data = []
-            for item in measurements:
-                data.append({
-                    'timestamp': datetime.fromisoformat(item['time']),
-                    'value': float(item['value']),
-                    'input_id': item.get('input_id', input_id),
-                    'measurement': item.get('measurement', 'unknown')
-                })
-            
-            return pd.DataFrame(data)
+            return _measurements_frame(measurements, input_id)
         except Exception as e:
             print(f"Error al obtener mediciones del daemon: {e}")
             return pd.DataFrame()
@@ -293,10 +515,31 @@ class MycodoConnector:
         profile = plant_profiles[profile_name]
         sensor_mapping = profile.get('sensor_mapping', {})
         
-        # Obtener datos para cada parámetro
+        # Obtener datos para cada parámetro, todos hasta el mismo instante. Las
+        # consultas son independientes y dominadas por la red/disco, así que se
+        # lanzan en hilos; el proxy del daemon no puede compartirse entre hilos
+        # y se consulta en serie.
+        now = datetime.now()
+        if self.connection_method == 'daemon' or len(sensor_mapping) < 2:
+            results = {param: self.get_measurements(input_id, days, now)
+                       for param, input_id in sensor_mapping.items()}
+        else:
+            # Un sensor compartido por varios parámetros se consulta una sola
+            # vez; get_measurements ya devuelve una copia, que recibe el primer
+            # parámetro, y el resto recibe la suya propia
+            input_ids = list(dict.fromkeys(sensor_mapping.values()))
+            with ThreadPoolExecutor(max_workers=min(_MAX_FETCH_WORKERS, len(input_ids))) as executor:
+                frames = dict(zip(input_ids, executor.map(
+                    lambda input_id: self.get_measurements(input_id, days, now), input_ids)))
+            results = {}
+            handed_out = set()
+            for param, input_id in sensor_mapping.items():
+                df = frames[input_id]
+                results[param] = df.copy() if input_id in handed_out else df
+                handed_out.add(input_id)
+        
         sensor_data = {}
-        for param, input_id in sensor_mapping.items():
-            df = self.get_measurements(input_id, days)
+        for param, df in results.items():
             if not df.empty:
                 sensor_data[param] = df
         
@@ -7,12 +7,8 @@ import json
 import argparse
 from datetime import datetime
 
-from mycodo_plant_analyzer.data_connector import MycodoConnector
-from mycodo_plant_analyzer.data_analyzer import DataPreprocessor, GrowthAnalyzer, VisualizationGenerator
-
-def main():
-    """Función principal para ejecutar el análisis de plantas."""
-    # Parsear argumentos de línea de comandos
+def _build_parser():
+    """Construye el parser de argumentos de línea de comandos."""
     parser = argparse.ArgumentParser(description='Mycodo Plant Analyzer - Sistema de análisis de plantas')
     parser.add_argument('--config', type=str, default='config/config.json',
                         help='Ruta al archivo de configuración (por defecto: config/config.json)')
@@ -22,8 +18,15 @@ def main():
                         help='Número de días de datos históricos a analizar (por defecto: 30)')
     parser.add_argument('--output', type=str, default=None,
                         help='Directorio de salida para informes y visualizaciones')
-    
-    args = parser.parse_args()
+    return parser
+
+# El parser se construye una sola vez y se reutiliza en cada llamada a main()
+_PARSER = _build_parser()
+
+def main():
+    """Función principal para ejecutar el análisis de plantas."""
+    # Parsear argumentos de línea de comandos
+    args = _PARSER.parse_args()
     
     # Verificar si existe el archivo de configuración
     if not os.path.exists(args.config):
@@ -52,6 +55,11 @@ def main():
     print(f"Analizando datos de los últimos {args.days} días")
     
     try:
+        # Importación diferida: pandas, scipy y matplotlib no se cargan para --help
+        # ni cuando los argumentos o la configuración no son válidos
+        from mycodo_plant_analyzer.data_connector import MycodoConnector
+        from mycodo_plant_analyzer.data_analyzer import DataPreprocessor, GrowthAnalyzer, VisualizationGenerator
+        
         # Inicializar componentes
         connector = MycodoConnector(config=config, config_file=args.config)
         preprocessor = DataPreprocessor(config=config)
@@ -87,13 +95,13 @@ def main():
         )
         
         # Mostrar resultados
-        overall_analysis = analysis_results.get('overall_analysis', {})
+        get_overall = analysis_results.get('overall_analysis', {}).get
         print("\nAnálisis completado con éxito!")
-        print(f"Puntuación general: {overall_analysis.get('overall_score', 0):.1f}/100 ({overall_analysis.get('category', 'desconocido').upper()})")
-        print(f"Evaluación: {overall_analysis.get('message', 'No disponible')}")
+        print(f"Puntuación general: {get_overall('overall_score', 0):.1f}/100 ({get_overall('category', 'desconocido').upper()})")
+        print(f"Evaluación: {get_overall('message', 'No disponible')}")
         
         # Mostrar recomendaciones
-        recommendations = overall_analysis.get('recommendations', [])
+        recommendations = get_overall('recommendations')
         if recommendations:
             print("\nRecomendaciones:")
             for i, rec in enumerate(recommendations):